@@ -0,0 +1,204 @@
+"""
+Production serving mode for the AlphaOne Research API.
+
+Serves the same routes as server.py on an asyncio (aiohttp) request path:
+
+    python async_server.py --port 5000
+
+Requests wait on the event loop instead of holding a worker thread. Only
+actual upstream fetches occupy a thread, and at most UPSTREAM_CONCURRENCY
+of them run at once. Requests that would need an upstream fetch queue up
+to REQUEST_QUEUE_SIZE deep; past that they are rejected with
+503 + Retry-After.
+"""
+import argparse
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from research_cache import AsyncResearchCache
+from prefetch import PREFETCH_ENABLED, PrefetchScheduler
+from metrics import (
+    QUEUE_DEPTH,
+    REQUEST_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    UPSTREAM_IN_FLIGHT,
+    record_cache_lookup,
+    render_metrics,
+)
+from server import (
+    build_research,
+    serialize_research,
+    parse_tickers,
+    ndjson_line,
+    ndjson_error,
+    payload_headers,
+    RESEARCH_CACHE_TTL,
+    RESEARCH_CACHE_STALE_TTL,
+    RESEARCH_BATCH_MAX_TICKERS,
+    UPSTREAM_CONCURRENCY,
+)
+
+# Requests allowed to wait for an upstream fetch before we shed load
+REQUEST_QUEUE_SIZE = int(os.getenv("REQUEST_QUEUE_SIZE", "256"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "2"))
+
+
+class Overloaded(Exception):
+    """Raised when the upstream request queue is full."""
+
+
+class ResearchService:
+    """Cached research lookups with bounded upstream concurrency and queueing."""
+
+    def __init__(self, upstream_concurrency=UPSTREAM_CONCURRENCY, queue_size=REQUEST_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.pending = 0
+
+        self._upstream = asyncio.Semaphore(upstream_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=upstream_concurrency, thread_name_prefix="upstream")
+        self.cache = AsyncResearchCache(self._fetch, ttl=RESEARCH_CACHE_TTL, stale_ttl=RESEARCH_CACHE_STALE_TTL,
+                                        on_lookup=record_cache_lookup)
+
+    async def _fetch(self, ticker):
+        # Wait for a slot on the loop, so no thread is held until the fetch starts
+        loop = asyncio.get_running_loop()
+        async with self._upstream:
+            with UPSTREAM_IN_FLIGHT.track_inprogress():
+                data = await loop.run_in_executor(self._executor, build_research, ticker)
+        return await loop.run_in_executor(self._executor, serialize_research, data)
+
+    async def research(self, ticker):
+        """Returns the payload for ticker, raising Overloaded if the queue is full."""
+        value = self.cache.peek(ticker)
+        if value is not None:
+            return value
+
+        if self.pending >= self.queue_size:
+            raise Overloaded()
+        self.pending += 1
+        try:
+            return await self.cache.get(ticker)
+        finally:
+            self.pending -= 1
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def overloaded_response():
+    return web.json_response(
+        {"error": "Server busy, retry shortly."},
+        status=503,
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def get_research(request):
+    with REQUESTS_IN_FLIGHT.labels('research').track_inprogress(), REQUEST_SECONDS.labels('research').time():
+        return await _research_response(request)
+
+
+async def _research_response(request):
+    service = request.app['service']
+    ticker = request.match_info['ticker'].upper()
+    try:
+        payload = await service.research(ticker)
+        request.app['prefetcher'].record_request(ticker)
+        body, encoding = payload.negotiate(request.headers.get('Accept-Encoding'))
+        headers = payload_headers(payload, encoding)
+        if payload.matches(request.headers.get('If-None-Match')):
+            return web.Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return web.Response(body=body, content_type='application/json', headers=headers)
+    except Overloaded:
+        return overloaded_response()
+    except Exception as e:
+        print(f"Error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_research_batch(request):
+    with REQUESTS_IN_FLIGHT.labels('batch').track_inprogress(), REQUEST_SECONDS.labels('batch').time():
+        return await _batch_response(request)
+
+
+async def _batch_response(request):
+    service = request.app['service']
+    tickers = parse_tickers(request.query.get('tickers'))
+    if not tickers:
+        return web.json_response({"error": "Pass tickers as ?tickers=TSLA,NVDA,..."}, status=400)
+    if len(tickers) > RESEARCH_BATCH_MAX_TICKERS:
+        return web.json_response({"error": f"At most {RESEARCH_BATCH_MAX_TICKERS} tickers per request."}, status=400)
+    if service.pending >= service.queue_size:
+        return overloaded_response()
+
+    async def lookup(ticker):
+        try:
+            line = ndjson_line(ticker, await service.research(ticker))
+            request.app['prefetcher'].record_request(ticker)
+            return line
+        except Overloaded:
+            return ndjson_error(ticker, "Server busy, retry shortly.")
+        except Exception as e:
+            print(f"Error for {ticker}: {e}")
+            return ndjson_error(ticker, str(e))
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "application/x-ndjson",
+        "Access-Control-Allow-Origin": "*",
+    })
+    await response.prepare(request)
+    for next_line in asyncio.as_completed([lookup(ticker) for ticker in tickers]):
+        await response.write(await next_line)
+    await response.write_eof()
+    return response
+
+
+async def get_metrics(request):
+    body, content_type = render_metrics()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+def create_app(upstream_concurrency=UPSTREAM_CONCURRENCY, queue_size=REQUEST_QUEUE_SIZE, prefetch=PREFETCH_ENABLED):
+    app = web.Application(middlewares=[cors_middleware])
+    service = ResearchService(upstream_concurrency, queue_size)
+    app['service'] = service
+    QUEUE_DEPTH.set_function(lambda: service.pending)
+    app.router.add_get('/api/research/{ticker}', get_research)
+    app.router.add_get('/api/research', get_research_batch)
+    app.router.add_get('/metrics', get_metrics)
+
+    async def on_startup(app):
+        # The scheduler thread drives refreshes on this loop
+        loop = asyncio.get_running_loop()
+        refresh = lambda ticker: asyncio.run_coroutine_threadsafe(service.cache.refresh(ticker), loop).result()
+        app['prefetcher'] = PrefetchScheduler(refresh)
+        if prefetch:
+            app['prefetcher'].start()
+
+    async def on_cleanup(app):
+        app['prefetcher'].stop()
+        service.close()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AlphaOne Research Server (async mode)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"Starting AlphaOne Research Server (async) on port {args.port}...")
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -0,0 +1,320 @@
+"""
+Benchmark for the whole market-data pipeline against a synthetic universe,
+runnable offline.
+
+A SyntheticProvider stands in for Yahoo Finance: thousands of tickers in
+peer groups, years of daily bars and multi-period statements, all derived
+deterministically from the ticker name. Each stage runs in a scratch
+directory with its own market cache, price store and outputs:
+
+    python bench_pipeline.py --tickers 2000 --years 3
+    python bench_pipeline.py --tickers 400 --compare       # diff against the last stored run
+
+Reports wall time, throughput and peak RSS per stage, and stores the
+results in bench_results/<commit>-<tickers>-<time>.json so runs can be compared across
+commits.
+"""
+import argparse
+import contextlib
+import datetime
+import functools
+import hashlib
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from market_providers import CachedProvider, MarketDataProvider, set_provider
+from market_store import MarketStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_results')
+
+PERIOD_BARS = {'5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, '5y': 1260}
+SECTORS = ["Technology", "Consumer Cyclical", "Healthcare", "Financial Services", "Energy", "Industrials"]
+STATEMENT_ITEMS = {
+    "financials": ["Total Revenue", "Cost Of Revenue", "Gross Profit", "Operating Income", "Net Income",
+                   "EBITDA", "Research And Development", "Selling General And Administration"],
+    "balance_sheet": ["Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity",
+                      "Cash And Cash Equivalents", "Total Debt", "Inventory"],
+    "cashflow": ["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow", "Repurchase Of Capital Stock"],
+}
+
+
+def _seed(ticker):
+    return int.from_bytes(hashlib.sha256(ticker.encode()).digest()[:4], 'little')
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic random-walk bars, statements and info for any ticker; no network."""
+
+    def __init__(self, years=3, periods=4, end=None):
+        self.years = years
+        self.periods = periods
+        self.end = end or datetime.date.today()
+
+    def _rng(self, ticker, salt=''):
+        return np.random.default_rng(_seed(ticker + salt))
+
+    def _bars(self, ticker):
+        return self._bars_until(ticker, self.end)
+
+    @functools.lru_cache(maxsize=8192)
+    def _bars_until(self, ticker, end):
+        dates = pd.bdate_range(end=pd.Timestamp(end), periods=self.years * 252, tz='America/New_York')
+        rng = self._rng(ticker, 'bars')
+        close = 20 + 200 * rng.random() * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(dates))))
+        spread = close * rng.uniform(0.002, 0.02, len(dates))
+        return pd.DataFrame({
+            "Open": close + rng.normal(0, 1, len(dates)) * spread / 2,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(10 ** 5, 10 ** 8, len(dates)).astype(float),
+        }, index=dates.rename("Date"))
+
+    def _statement(self, ticker, kind, quarterly=False):
+        rng = self._rng(ticker, kind)
+        if quarterly:
+            columns = pd.date_range(end=pd.Timestamp(self.end), periods=self.periods, freq='QE')[::-1]
+        else:
+            columns = pd.DatetimeIndex([pd.Timestamp(self.end.year - 1 - i, 12, 31) for i in range(self.periods)])
+        items = STATEMENT_ITEMS[kind]
+        scale = 10 ** rng.uniform(8, 11)
+        values = scale * rng.uniform(0.05, 1.0, (len(items), 1)) * np.cumprod(rng.uniform(0.85, 1.25, (1, len(columns))), axis=1)
+        return pd.DataFrame(values, index=items, columns=columns)
+
+    def info(self, ticker):
+        rng = self._rng(ticker, 'info')
+        price = float(self._bars(ticker)['Close'].iloc[-1])
+        return {
+            "longName": f"{ticker} Holdings",
+            "sector": SECTORS[_seed(ticker) % len(SECTORS)],
+            "industry": "Synthetic",
+            "currentPrice": price,
+            "marketCap": float(price * rng.uniform(1e8, 1e10)),
+            "trailingPE": float(rng.uniform(-10, 80)),
+            "forwardPE": float(rng.uniform(5, 60)),
+            "priceToSalesTrailing12Months": float(rng.uniform(0.5, 20)),
+            "grossMargins": float(rng.uniform(0.1, 0.8)),
+            "operatingMargins": float(rng.uniform(-0.1, 0.4)),
+            "profitMargins": float(rng.uniform(-0.2, 0.35)),
+            "beta": float(rng.uniform(0.4, 2.2)),
+            "lastFiscalYearEnd": int(datetime.datetime(self.end.year - 1, 12, 31, tzinfo=datetime.timezone.utc).timestamp()),
+        }
+
+    def financials(self, ticker):
+        return self._statement(ticker, "financials")
+
+    def quarterly_financials(self, ticker):
+        return self._statement(ticker, "financials", quarterly=True)
+
+    def balance_sheet(self, ticker):
+        return self._statement(ticker, "balance_sheet")
+
+    def cashflow(self, ticker):
+        return self._statement(ticker, "cashflow")
+
+    def history(self, ticker, period='1y'):
+        return self._bars(ticker).tail(PERIOD_BARS.get(period, 252))
+
+
+def synthetic_universe(count, group_size=4):
+    """{main: [peers]} covering `count` tickers in groups of `group_size`."""
+    tickers = [f"S{i:05d}" for i in range(count)]
+    return {tickers[i]: tickers[i + 1:i + group_size] for i in range(0, count, group_size)}
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class StageTimer:
+    """Times named stages, silencing their per-ticker output."""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.results = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, items):
+        sink = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with sink:
+            yield
+        seconds = time.perf_counter() - started
+        self.results[name] = {
+            "seconds": round(seconds, 4),
+            "items": items,
+            "perSecond": round(items / seconds, 1) if seconds else None,
+            "peakRssMb": round(peak_rss_mb(), 1),
+        }
+        print(f"  {name:<24} {seconds:8.2f}s  {items:>7} items  {items / seconds if seconds else 0:10.1f}/s"
+              f"  peak RSS {peak_rss_mb():7.1f} MB")
+
+
+def run_benchmark(count, years, periods, research_requests, verbose=False, keep=False):
+    """Runs every stage once in a scratch directory (removed afterwards unless `keep`); returns {stage: result}."""
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    cwd = os.getcwd()
+    try:
+        return _run_stages(workdir, count, years, periods, research_requests, verbose)
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f"Kept scratch dir {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _run_stages(workdir, count, years, periods, research_requests, verbose):
+    os.makedirs(os.path.join(workdir, 'slide_deck'))
+    os.environ.update({
+        "PRICE_STORE_DIR": os.path.join(workdir, 'price_store'),
+        "MARKET_CACHE_DB": os.path.join(workdir, 'market_cache.sqlite'),
+        "LLM_CACHE": "off",
+        "PERPLEXITY_API_KEY": "",
+        "PREFETCH_ENABLED": "0",
+    })
+    os.chdir(workdir)
+
+    # Start a few days behind so the incremental stage has new bars to add
+    synthetic = SyntheticProvider(years=years, periods=periods, end=datetime.date.today() - datetime.timedelta(days=4))
+    set_provider(CachedProvider(synthetic, MarketStore(os.environ["MARKET_CACHE_DB"])))
+
+    import fetch_market_data
+    import fetch_statements
+    import generate_data_js
+    import peer_aggregates
+    import server
+
+    fetch_market_data.TICKERS = synthetic_universe(count)
+    universe = fetch_market_data.universe()
+    mains = list(fetch_market_data.TICKERS)
+    timer = StageTimer(verbose)
+    print(f"Universe: {len(universe)} tickers ({len(mains)} peer groups), {years}y of bars, "
+          f"{periods} statement periods; scratch dir {workdir}")
+
+    with timer.stage("live_prices", len(universe)):
+        live = fetch_market_data.fetch_live_data(max_workers=16, rate=1e9)
+    with timer.stage("live_data.js", len(live)):
+        os.makedirs('slide_deck', exist_ok=True)
+        fetch_market_data.generate_js_file(live)
+
+    with timer.stage("market_data_full", len(mains)):
+        fetch_market_data.write_market_data(*fetch_market_data.update_market_data())
+    synthetic.end = datetime.date.today()
+    with timer.stage("market_data_incremental", len(mains)):
+        fetch_market_data.write_market_data(*fetch_market_data.update_market_data())
+
+    with timer.stage("statements_export", len(universe)):
+        fetch_statements.export_statements(universe, output='statements.csv', max_workers=16, rate=1e9)
+
+    with timer.stage("peer_aggregates", len(universe)):
+        aggregates = peer_aggregates.compute_aggregates()
+        for ticker in mains:
+            aggregates.summary(ticker)
+
+    with timer.stage("data.js_inline", len(mains)):
+        generate_data_js.generate_data_js()
+    with timer.stage("data.js_sharded", len(mains)):
+        generate_data_js.generate_data_js(sharded=True)
+
+    sample = [universe[i % len(universe)] for i in range(research_requests)]
+    with timer.stage("research_build", len(sample)):
+        for ticker in sample:
+            server.serialize_research(server.build_research(ticker))
+
+    return timer.results
+
+
+def load_result(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def previous_result(params, exclude=None):
+    """Most recent stored run with the same parameters, other than `exclude`."""
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    candidates = []
+    for name in os.listdir(RESULTS_DIR):
+        path = os.path.join(RESULTS_DIR, name)
+        if name.endswith('.json') and os.path.abspath(path) != os.path.abspath(exclude or ''):
+            result = load_result(path)
+            if result.get("params") == params:
+                candidates.append((result["timestamp"], path))
+    return max(candidates)[1] if candidates else None
+
+
+def compare(current, baseline):
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    for stage, result in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None or not before["seconds"]:
+            print(f"  {stage:<24} (new)")
+            continue
+        change = (result["seconds"] - before["seconds"]) / before["seconds"] * 100
+        # Ignore jitter on stages that only take milliseconds
+        flag = "  <-- slower" if change > 10 and result["seconds"] - before["seconds"] > 0.05 else ""
+        print(f"  {stage:<24} {before['seconds']:8.2f}s -> {result['seconds']:8.2f}s ({change:+6.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the market-data pipeline on a synthetic universe")
+    parser.add_argument('--tickers', type=int, default=2000, help="Synthetic universe size")
+    parser.add_argument('--years', type=int, default=3, help="Years of daily bars per ticker")
+    parser.add_argument('--periods', type=int, default=4, help="Statement periods per ticker")
+    parser.add_argument('--research-requests', type=int, default=200, help="Payloads built by the server stage")
+    parser.add_argument('--compare', nargs='?', const='', metavar='RESULT',
+                        help="Compare with a stored result file (default: the most recent one)")
+    parser.add_argument('--no-save', action='store_true', help="Don't store the result")
+    parser.add_argument('--verbose', action='store_true', help="Show the pipeline's own output")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch directory for inspection")
+    args = parser.parse_args()
+    # The benchmark runs in a scratch directory; resolve the baseline path first
+    compare_path = os.path.abspath(args.compare) if args.compare else args.compare
+
+    stages = run_benchmark(args.tickers, args.years, args.periods, args.research_requests, args.verbose, args.keep)
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        "params": {"tickers": args.tickers, "years": args.years, "periods": args.periods,
+                   "researchRequests": args.research_requests},
+        "stages": stages,
+    }
+
+    path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = result["timestamp"].replace(':', '').replace('-', '')[:15]
+        path = os.path.join(RESULTS_DIR, f"{result['commit']}-{args.tickers}-{stamp}.json")
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {path}")
+
+    if args.compare is not None:
+        baseline_path = compare_path or previous_result(result["params"], exclude=path)
+        if baseline_path:
+            compare(result, load_result(baseline_path))
+        else:
+            print("\nNo stored result to compare with.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Throughput benchmark for the research payload builder, runnable offline.
+
+Record fixtures once (needs network):
+
+    python bench_server.py --record TSLA NVDA AAPL NKE
+
+Then replay them at fixed concurrency with injected upstream latency:
+
+    python bench_server.py --concurrency 16 --requests 400 --latency-ms 150
+
+Reports req/s, end-to-end p50/p95/p99 and per-stage timings. Pass
+--cached to drive the request path through the research cache instead of
+calling build_research directly.
+"""
+import argparse
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from market_providers import DEFAULT_FIXTURES_DIR, LiveProvider, RecordingProvider, ReplayProvider, set_provider
+from stage_timing import add_stage_observer
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def record_fixtures(tickers, fixtures_dir):
+    set_provider(RecordingProvider(LiveProvider(), fixtures_dir))
+    import server
+    for ticker in tickers:
+        print(f"Recording {ticker}...")
+        server.build_research(ticker)
+    print(f"Fixtures written to {fixtures_dir}")
+
+
+def recorded_tickers(fixtures_dir):
+    if not os.path.isdir(fixtures_dir):
+        return []
+    return sorted(name for name in os.listdir(fixtures_dir) if os.path.isdir(os.path.join(fixtures_dir, name)))
+
+
+def run_benchmark(tickers, concurrency, total_requests, cached):
+    import server
+
+    stage_samples = defaultdict(list)
+    samples_lock = threading.Lock()
+
+    def observe(stage, seconds, failed):
+        with samples_lock:
+            stage_samples[stage].append(seconds)
+    add_stage_observer(observe)
+
+    if cached:
+        handler = server.research_cache.get
+    else:
+        handler = lambda ticker: server.serialize_research(server.build_research(ticker))
+
+    def one_request(i):
+        ticker = tickers[i % len(tickers)]
+        start = time.perf_counter()
+        handler(ticker)
+        return time.perf_counter() - start
+
+    # Warm imports, fixture parsing (and the cache, if used) outside the measured window
+    for ticker in tickers:
+        handler(ticker)
+    stage_samples.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one_request, range(total_requests)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed, stage_samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research payload builder against recorded fixtures")
+    parser.add_argument('--fixtures', default=os.getenv("MARKET_DATA_FIXTURES", DEFAULT_FIXTURES_DIR))
+    parser.add_argument('--record', nargs='+', metavar='TICKER', help="Record fixtures for these tickers and exit")
+    parser.add_argument('--tickers', nargs='+', help="Tickers to drive (default: every recorded ticker)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Injected latency per upstream call")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Extra random latency per upstream call")
+    parser.add_argument('--cached', action='store_true', help="Go through the research cache")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures([t.upper() for t in args.record], args.fixtures)
+        return
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else recorded_tickers(args.fixtures)
+    if not tickers:
+        print(f"Error: no fixtures in {args.fixtures}. Run with --record first.")
+        return
+
+    set_provider(ReplayProvider(args.fixtures, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000))
+    print(f"Driving {len(tickers)} tickers x {args.requests} requests at concurrency {args.concurrency}"
+          f" ({args.latency_ms:.0f}ms injected latency{', cached' if args.cached else ''})...")
+    latencies, elapsed, stage_samples = run_benchmark(tickers, args.concurrency, args.requests, args.cached)
+
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s ({len(latencies)} requests in {elapsed:.2f}s)")
+    print(f"Latency:    p50 {percentile(latencies, 50) * 1000:.1f}ms"
+          f" | p95 {percentile(latencies, 95) * 1000:.1f}ms"
+          f" | p99 {percentile(latencies, 99) * 1000:.1f}ms")
+    print("Stages:")
+    for stage, samples in stage_samples.items():
+        samples.sort()
+        print(f"  {stage:<14} n={len(samples):<6} mean {sum(samples) / len(samples) * 1000:8.2f}ms"
+              f" | p95 {percentile(samples, 95) * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
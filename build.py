@@ -0,0 +1,236 @@
+"""
+Single entry point for refreshing the slide deck's data.
+
+Stages form a DAG:
+
+    live_prices ─────────────────────────────> slide_deck/live_data.js
+    market_data (prices + financials) ──┐
+                                        ├─> deck_data (LLM enrichment + render) -> slide_deck/data.js
+    tesla_financials ──────────────────────────> tesla_financials.csv
+    statements (all tickers, long format) ─────> statements.parquet / .csv
+
+Each stage is keyed by a content hash of its input files (its own source
+included), any options that change its output (e.g. --sharded) and, for
+stages that pull from the network, a refresh bucket so
+upstream data is re-fetched at most once per interval. A stage whose key
+and outputs match the last successful run is skipped, so downstream
+stages see unchanged inputs and skip too. Independent stages run in
+parallel.
+
+    python build.py              # run what changed
+    python build.py --force      # run everything
+    python build.py --sharded    # switch the deck to per-ticker shards
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(ROOT, '.build_state.json')
+
+
+class Stage:
+    """A named step with file inputs/outputs, upstream stages, options and an optional refresh interval."""
+
+    def __init__(self, name, run, inputs=(), outputs=(), deps=(), refresh=None, params=None):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.refresh = refresh  # seconds; None for stages that only depend on their inputs
+        self.params = dict(params or {})  # options that change the outputs; part of the key
+
+
+def file_digest(path):
+    """sha256 of a file's contents, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(stage, now=None):
+    parts = {"inputs": {path: file_digest(path) for path in sorted(stage.inputs)}}
+    if stage.params:
+        parts["params"] = stage.params
+    if stage.refresh:
+        now = time.time() if now is None else now
+        parts["bucket"] = int(now // stage.refresh)
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def output_digests(stage):
+    return {path: file_digest(path) for path in stage.outputs}
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def is_fresh(stage, previous):
+    """True when the last run had the same key and its outputs are still on disk, untouched."""
+    if not previous or previous.get("key") != stage_key(stage):
+        return False
+    outputs = output_digests(stage)
+    return None not in outputs.values() and outputs == previous.get("outputs")
+
+
+def run_pipeline(stages, force=(), max_workers=4):
+    """
+    Runs stages in dependency order, in parallel where possible. `force`
+    is a set of stage names to run regardless of freshness ("*" for all).
+    Returns {stage: (status, seconds)}.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    state = load_state()
+    state_lock = threading.Lock()
+    results = {}
+
+    def execute(stage):
+        if "*" not in force and stage.name not in force and is_fresh(stage, state.get(stage.name)):
+            return "skipped", 0.0
+        started = time.perf_counter()
+        stage.run()
+        elapsed = time.perf_counter() - started
+        with state_lock:
+            state[stage.name] = {"key": stage_key(stage), "outputs": output_digests(stage), "seconds": round(elapsed, 3)}
+            save_state(state)
+        return "ran", elapsed
+
+    pending = dict(by_name)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep not in results for dep in stage.deps):
+                    continue
+                del pending[name]
+                if any(results[dep][0] == "failed" for dep in stage.deps):
+                    results[name] = ("failed", 0.0)
+                    print(f"[{name}] not run: an upstream stage failed")
+                    continue
+                print(f"[{name}] starting")
+                running[pool.submit(execute, stage)] = name
+            if not running:
+                for name in pending:
+                    print(f"[{name}] not run: unknown upstream stage")
+                    results[name] = ("failed", 0.0)
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"[{name}] failed: {e}")
+                    results[name] = ("failed", 0.0)
+                else:
+                    status, seconds = results[name]
+                    print(f"[{name}] {status}" + (f" in {seconds:.2f}s" if status == "ran" else " (inputs unchanged)"))
+    return results
+
+
+def statements_output():
+    # Mirrors fetch_statements.DEFAULT_OUTPUT without importing pandas for --list
+    try:
+        import pyarrow  # noqa: F401
+        return "statements.parquet"
+    except ImportError:
+        return "statements.csv"
+
+
+def default_stages(sharded=False):
+    # Imports are deferred so `--list` works without the data dependencies installed
+    def live_prices():
+        from fetch_market_data import fetch_live_data, generate_js_file
+        generate_js_file(fetch_live_data())
+
+    def market_data():
+        from fetch_market_data import update_market_data, write_market_data
+        write_market_data(*update_market_data())
+
+    def tesla_financials():
+        from fetch_tesla_data import fetch_tesla_data
+        fetch_tesla_data()
+
+    def statements():
+        from fetch_statements import export_statements
+        from fetch_market_data import universe
+        export_statements(universe())
+
+    def deck_data():
+        from generate_data_js import generate_data_js
+        generate_data_js(sharded=sharded)
+
+    return [
+        Stage("live_prices", live_prices,
+              inputs=["fetch_market_data.py", "market_providers.py"],
+              outputs=["slide_deck/live_data.js"], refresh=15 * 60),
+        Stage("market_data", market_data,
+              inputs=["fetch_market_data.py", "market_providers.py", "indicators.py"],
+              outputs=["market_data.json", "market_data.state.json", "price_store/index.json"], refresh=24 * 60 * 60),
+        Stage("tesla_financials", tesla_financials,
+              inputs=["fetch_tesla_data.py", "market_providers.py"],
+              outputs=["tesla_financials.csv"], refresh=24 * 60 * 60),
+        Stage("statements", statements,
+              inputs=["fetch_statements.py", "market_providers.py"],
+              outputs=[statements_output()], refresh=24 * 60 * 60),
+        Stage("deck_data", deck_data,
+              inputs=["market_data.json", "price_store/index.json", "generate_data_js.py", "fetch_llm_data.py",
+                      "peer_aggregates.py"],
+              outputs=["slide_deck/data.js", *(["slide_deck/data/manifest.json"] if sharded else [])],
+              deps=["market_data"], params={"sharded": sharded}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the slide deck data, skipping stages whose inputs are unchanged")
+    parser.add_argument('--force', nargs='*', metavar='STAGE', help="Re-run these stages (all if none given)")
+    parser.add_argument('--sharded', action='store_true', help="Write per-ticker data shards (see generate_data_js.py)")
+    parser.add_argument('--workers', type=int, default=4, help="Stages run in parallel")
+    parser.add_argument('--list', action='store_true', help="Show each stage and whether it is up to date")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    stages = default_stages(sharded=args.sharded)
+
+    if args.list:
+        state = load_state()
+        for stage in stages:
+            status = "fresh" if is_fresh(stage, state.get(stage.name)) else "stale"
+            deps = f" <- {', '.join(stage.deps)}" if stage.deps else ""
+            print(f"{stage.name:<18} {status}{deps}")
+        return
+
+    force = set(args.force) if args.force else ({"*"} if args.force is not None else set())
+    started = time.perf_counter()
+    results = run_pipeline(stages, force=force, max_workers=args.workers)
+
+    print("\nStage timings:")
+    for stage in stages:
+        status, seconds = results[stage.name]
+        print(f"  {stage.name:<18} {status:<8} {seconds:7.2f}s")
+    print(f"Total: {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,18 @@ st.set_page_config(
 load_css()
 SessionManager.init_session()
 stats = SessionManager.get_stats()
+analytics = SessionManager.get_analytics()
+cases_this_week = analytics.get('cases_this_week', 0)
+
+def change_line(value, text):
+    """Stat-card delta: green when up, red when down, muted with nothing to compare."""
+    if value is None:
+        return '<div class="stat-change" style="color: #A0A0B0;">Not enough cases to compare</div>'
+    css = "positive" if value >= 0 else "negative"
+    return f'<div class="stat-change {css}">{text}</div>'
+
+def format_time(hours):
+    return f"{int(hours)}h {int((hours - int(hours)) * 60)}m"
 
 # Custom CSS for Dashboard
 st.markdown("""
@@ -56,10 +68,13 @@ st.markdown("""
 # Top Bar
 col1, col2 = st.columns([3, 1])
 with col1:
-    st.markdown("# Welcome back, Tanvi!")
+    st.markdown(f"# Welcome back, {SessionManager.display_name()}!")
 with col2:
     if st.button("Start New Case", type="primary", use_container_width=True):
         st.switch_page("pages/1_Case_Library.py")
+    if st.button("Sign out", use_container_width=True):
+        SessionManager.sign_out()
+        st.rerun()
 
 # Stats Row
 c1, c2, c3 = st.columns(3)
@@ -69,27 +84,27 @@ with c1:
     <div class="stat-card">
         <div class="stat-label">Cases Completed</div>
         <div class="stat-value">{stats['cases_completed']}</div>
-        <div class="stat-change positive">+5% this week</div>
+        {change_line(cases_this_week, f"+{cases_this_week} this week")}
     </div>
     """, unsafe_allow_html=True)
 
 with c2:
+    score_change = analytics.get('week_delta', {}).get('score')
     st.markdown(f"""
     <div class="stat-card">
         <div class="stat-label">Average Score</div>
         <div class="stat-value">{stats['average_score']}%</div>
-        <div class="stat-change positive">+2% this week</div>
+        {change_line(score_change, f"{score_change:+g}% this week" if score_change is not None else "")}
     </div>
     """, unsafe_allow_html=True)
 
 with c3:
-    hours = int(stats['hours_practiced'])
-    mins = int((stats['hours_practiced'] - hours) * 60)
+    week_hours = cases_this_week * 0.5 # Assume 30 mins per case
     st.markdown(f"""
     <div class="stat-card">
         <div class="stat-label">Time Practiced</div>
-        <div class="stat-value">{hours}h {mins}m</div>
-        <div class="stat-change positive">+10% this week</div>
+        <div class="stat-value">{format_time(stats['hours_practiced'])}</div>
+        {change_line(week_hours, f"+{format_time(week_hours)} this week")}
     </div>
     """, unsafe_allow_html=True)
 
@@ -118,10 +133,12 @@ chart = alt.Chart(trend_data).mark_line(
     strokeWidth=0
 )
 
-# Render Chart in a Card
+# Render Chart in a Card: recent form against the all-time average
+form = analytics.get('rolling_vs_average', {}).get('score')
+form_html = "" if form is None else f'<span style="font-size: 14px; color: {"#00F260" if form >= 0 else "#FF4B4B"}; margin-left: 10px;">{form:+g}%</span>'
 st.markdown(f"""
 <div class="stat-card" style="padding: 0px 20px 20px 20px;">
-    <div style="padding-top: 20px; font-size: 24px; font-weight: 700;">{stats['average_score']}% Avg Score <span style="font-size: 14px; color: #00F260; margin-left: 10px;">+2%</span></div>
+    <div style="padding-top: 20px; font-size: 24px; font-weight: 700;">{stats['average_score']}% Avg Score {form_html}</div>
     <div style="color: #A0A0B0; font-size: 14px; margin-bottom: 20px;">Last 10 Cases</div>
 </div>
 """, unsafe_allow_html=True)
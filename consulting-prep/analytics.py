@@ -0,0 +1,89 @@
+"""
+Performance analytics computed from the stored interview scores.
+
+Everything is derived with vectorized pandas operations over one frame of
+a user's interviews: overall and per-skill averages, this week vs last
+week, a rolling window over the most recent cases, and the latest case
+against the user's average. `user_analytics` memoizes the result per
+(user, history version, day), so a rerun that didn't add a case
+recomputes nothing.
+"""
+import datetime
+import pandas as pd
+import streamlit as st
+from storage import BREAKDOWN_KEYS
+
+METRICS = ["score", *BREAKDOWN_KEYS]
+
+# Breakdown dimension -> skill shown on the dashboard
+SKILLS = {
+    "Structure": "Problem Structuring",
+    "Analysis": "Quantitative Analysis",
+    "Communication": "Communication",
+}
+
+# Cases in the rolling "recent form" window
+ROLLING_WINDOW = 10
+
+
+def scores_frame(rows):
+    """score_rows() tuples -> frame with a datetime `date` column, oldest first."""
+    frame = pd.DataFrame.from_records(rows, columns=["date", "case", *METRICS])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame[METRICS] = frame[METRICS].apply(pd.to_numeric, errors='coerce')
+    return frame
+
+
+def _rounded(values):
+    return {key: (None if pd.isna(value) else round(float(value), 1)) for key, value in values.items()}
+
+
+def compute(frame, today=None):
+    """
+    Analytics for one user's interviews. Week buckets count back from the
+    end of `today`: week 0 is the last 7 days, week 1 the 7 before that.
+    Deltas are None when either side has no cases.
+    """
+    today = today or datetime.date.today()
+    if frame.empty:
+        return {"count": 0}
+
+    metrics = frame[METRICS]
+    average = metrics.mean()
+
+    end = pd.Timestamp(today) + pd.Timedelta(days=1)
+    week = (end - frame["date"]) // pd.Timedelta(days=7)
+    weekly = metrics.groupby(week).mean().reindex([0, 1])
+    week_counts = week.value_counts()
+
+    rolling = metrics.rolling(ROLLING_WINDOW, min_periods=1).mean().iloc[-1]
+    latest = frame.iloc[-1]
+
+    return {
+        "count": len(frame),
+        "average": _rounded(average),
+        "latest": {
+            "case": latest["case"],
+            "date": latest["date"].strftime("%B %d, %Y"),
+            **_rounded(latest[METRICS]),
+        },
+        "latest_vs_average": _rounded(latest[METRICS] - average),
+        "cases_this_week": int(week_counts.get(0, 0)),
+        "cases_last_week": int(week_counts.get(1, 0)),
+        "week_delta": _rounded(weekly.loc[0] - weekly.loc[1]),
+        "rolling": _rounded(rolling),
+        "rolling_vs_average": _rounded(rolling - average),
+    }
+
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def user_analytics(_store, user, version, today):
+    """
+    compute() over the user's interviews in `_store` (a ProgressStore; not
+    part of the cache key). `version` is _store.history_version(user),
+    which changes whenever any session queues a case for the user; only a
+    cache miss waits for those writes to land. `today` (ISO date) rolls the
+    week buckets over at midnight.
+    """
+    _store.wait_for_history(user, version)
+    return compute(scores_frame(_store.score_rows(user)), datetime.date.fromisoformat(today))
@@ -1,46 +1,164 @@
+import os
 import streamlit as st
 import datetime
 import random
+from collections import deque
 import pandas as pd
+from analytics import SKILLS, user_analytics
+from history import DATE_FORMAT, InterviewHistory
+from storage import BREAKDOWN_KEYS, DEFAULT_DB_PATH, HISTORY_PAGE_SIZE, ProgressStore
+
+# Scores shown in the performance trend
+TREND_LENGTH = 10
+
+@st.cache_resource
+def get_store():
+    """One progress store (and writer thread) per server process."""
+    return ProgressStore(os.getenv("CONSULTPREP_DB", DEFAULT_DB_PATH))
+
+class RunningStats:
+    """Interview aggregates kept up to date one entry at a time, so reads never scan history."""
+
+    def __init__(self, count=0, score_total=0, breakdown_totals=None, recent=()):
+        self.count = count
+        self.score_total = score_total
+        self.breakdown_totals = {key: 0 for key in BREAKDOWN_KEYS}
+        self.breakdown_totals.update(breakdown_totals or {})
+        self.recent = deque(recent, maxlen=TREND_LENGTH)
+
+    @classmethod
+    def from_history(cls, history):
+        """Rebuilds the aggregates from a full, oldest-first history."""
+        stats = cls()
+        for entry in history:
+            stats.add(entry)
+        return stats
+
+    def add(self, entry):
+        self.count += 1
+        self.score_total += entry['score']
+        for key in BREAKDOWN_KEYS:
+            self.breakdown_totals[key] += entry['breakdown'].get(key, 0)
+        self.recent.append(entry['score'])
+
+    def average(self):
+        return int(self.score_total / self.count) if self.count else 0
+
+    def breakdown_averages(self):
+        return {key: (round(total / self.count, 1) if self.count else 0) for key, total in self.breakdown_totals.items()}
+
+    def __eq__(self, other):
+        return (isinstance(other, RunningStats) and self.count == other.count
+                and self.score_total == other.score_total and self.breakdown_totals == other.breakdown_totals
+                and list(self.recent) == list(other.recent))
 
 class SessionManager:
     """
-    Manages user sessions and simulates a backend database.
+    Manages per-user sessions. Each browser session belongs to one user,
+    signed in with a password, and holds only that user's progress;
+    shared content lives in shared.py. Session state is the working copy;
+    every change is also queued to the SQLite progress store, which
+    repopulates it on the next visit.
     """
     
     @staticmethod
     def init_session():
-        """Initialize session state variables if they don't exist."""
-        # Robust Reset for Tanvi
-        if 'user_identity' not in st.session_state or st.session_state['user_identity'] != 'Tanvi':
-            st.session_state.clear()
-            st.session_state['user_identity'] = 'Tanvi'
+        """
+        Initialize session state for the signed-in user. Stops the script
+        behind a sign-in form until a user is known.
+        """
+        if SessionManager.current_user() is None:
+            SessionManager.sign_in()
             
         defaults = {
             'user_xp': 0,
-            'cases_completed': 0,
-            'hours_practiced': 0.0,
-            'average_score': 0,
             'completed_modules': [],
-            'interview_history': [],
-            'performance_trend': [], 
-            'skills': {
-                'Problem Structuring': 0,
-                'Quantitative Analysis': 0,
-                'Business Acumen': 0,
-                'Communication': 0,
-                'Synthesis': 0
-            }
+            'interview_history': InterviewHistory(),
         }
         
         for key, value in defaults.items():
             if key not in st.session_state:
                 st.session_state[key] = value
 
+        if not st.session_state.get('progress_loaded'):
+            SessionManager._load_progress()
+
+    @staticmethod
+    def current_user():
+        """The user signed in to this browser session, or None."""
+        return st.session_state.get('user_identity')
+
+    @staticmethod
+    def sign_in():
+        """
+        Renders the sign-in form and stops the script. The first sign-in
+        under a name sets its password; later ones must match it.
+        """
+        st.markdown("# Sign in")
+        st.caption("New here? Pick a name and password; you'll use them to sign back in.")
+        with st.form("sign_in"):
+            name = st.text_input("Name or email")
+            password = st.text_input("Password", type="password")
+            if st.form_submit_button("Continue", type="primary") and name.strip():
+                if not password:
+                    st.error("Enter a password.")
+                    st.stop()
+                if get_store().authenticate(name.strip(), password):
+                    # Nothing from a previous user survives into the new session
+                    st.session_state.clear()
+                    st.session_state['user_identity'] = name.strip()
+                    st.rerun()
+                st.error("That name is taken and the password doesn't match.")
+        st.stop()
+
+    @staticmethod
+    def sign_out():
+        st.session_state.clear()
+
+    @staticmethod
+    def display_name():
+        """How to address the candidate: their name, or an email's local part."""
+        return SessionManager._user().split('@')[0]
+
+    @staticmethod
+    def _user():
+        return st.session_state['user_identity']
+
+    @staticmethod
+    def _load_progress():
+        """Fills a fresh session from the store: totals up front, history one page at a time."""
+        profile = get_store().profile(SessionManager._user())
+        st.session_state['user_xp'] = profile['xp']
+        st.session_state['completed_modules'] = profile['completed_modules']
+        st.session_state['interview_stats'] = RunningStats(
+            profile['cases_completed'], profile['score_total'], profile['breakdown_totals'], profile['recent_scores'])
+        st.session_state['interview_history'] = InterviewHistory()
+        st.session_state['history_cursor'] = None
+        st.session_state['history_complete'] = False
+        SessionManager.load_more_history()
+        st.session_state['progress_loaded'] = True
+
+    @staticmethod
+    def load_more_history():
+        """Prepends the next-oldest page of interviews; returns False once everything is loaded."""
+        page, cursor = get_store().history_page(SessionManager._user(), st.session_state['history_cursor'])
+        st.session_state['history_complete'] = len(page) < HISTORY_PAGE_SIZE
+        if not page:
+            return False
+        st.session_state['interview_history'].prepend(page[::-1])
+        st.session_state['history_cursor'] = cursor
+        return True
+
+    @staticmethod
+    def has_older_history():
+        """True until a history page comes back short, i.e. older interviews may still be in the store."""
+        return not st.session_state.get('history_complete', True)
+
     @staticmethod
     def add_xp(amount):
         """Add XP to the user's profile."""
         st.session_state['user_xp'] += amount
+        get_store().add_xp(SessionManager._user(), amount)
         # st.toast(f"🚀 +{amount} XP Gained!")
 
     @staticmethod
@@ -48,6 +166,7 @@ class SessionManager:
         """Mark a learning module as complete."""
         if module_name not in st.session_state['completed_modules']:
             st.session_state['completed_modules'].append(module_name)
+            get_store().add_module(SessionManager._user(), module_name)
             SessionManager.add_xp(50)
 
     @staticmethod
@@ -71,38 +190,56 @@ class SessionManager:
             breakdown = {"Structure": final_score, "Analysis": final_score, "Communication": final_score}
             
         entry = {
-            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "date": datetime.datetime.now().strftime(DATE_FORMAT),
             "case": case_name,
             "feedback": feedback,
             "score": final_score,
             "breakdown": breakdown
         }
         st.session_state['interview_history'].append(entry)
+        st.session_state['interview_stats'].add(entry)
+        get_store().add_interview(SessionManager._user(), entry)
         
         # XP is still additive
         SessionManager.add_xp(100)
 
     @staticmethod
     def get_stats():
-        """Return user statistics calculated dynamically from history."""
-        history = st.session_state.get('interview_history', [])
-        
-        # Calculate Stats
-        cases_completed = len(history)
-        hours_practiced = cases_completed * 0.5 # Assume 30 mins per case
+        """Return user statistics from the running aggregates (constant time)."""
+        SessionManager.init_session()
+        stats = st.session_state['interview_stats']
         
-        if cases_completed > 0:
-            avg_score = int(sum(item['score'] for item in history) / cases_completed)
-            trend = [item['score'] for item in history][-10:] # Last 10
-        else:
-            avg_score = 0
-            trend = []
-            
         return {
             "xp": st.session_state.get('user_xp', 0),
-            "cases_completed": cases_completed,
-            "hours_practiced": hours_practiced,
-            "average_score": avg_score,
-            "trend": trend,
-            "skills": st.session_state.get('skills', {})
+            "cases_completed": stats.count,
+            "hours_practiced": stats.count * 0.5, # Assume 30 mins per case
+            "average_score": stats.average(),
+            "breakdown": stats.breakdown_averages(),
+            "trend": list(stats.recent), # Last 10
+            "skills": {SKILLS[key]: round(value) for key, value in stats.breakdown_averages().items()}
         }
+
+    @staticmethod
+    def get_history():
+        """The session's loaded interviews (an InterviewHistory), oldest first."""
+        SessionManager.init_session()
+        return st.session_state['interview_history']
+
+    @staticmethod
+    def get_analytics():
+        """Week-over-week, rolling and vs-average analytics; recomputed only when a case is added."""
+        SessionManager.init_session()
+        store, user = get_store(), SessionManager._user()
+        return user_analytics(store, user, store.history_version(user), datetime.date.today().isoformat())
+
+    @staticmethod
+    def rebuild_stats():
+        """
+        Recomputes the aggregates from the full stored history and swaps
+        them in. Returns True if the running copy had drifted.
+        """
+        get_store().flush()
+        rebuilt = RunningStats.from_history(get_store().history(SessionManager._user()))
+        drifted = rebuilt != st.session_state.get('interview_stats')
+        st.session_state['interview_stats'] = rebuilt
+        return drifted
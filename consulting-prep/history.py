@@ -0,0 +1,122 @@
+"""
+Compact, columnar interview history.
+
+A session's history used to be a list of dicts (date string, case name,
+feedback, score, nested breakdown dict), several hundred bytes of object
+overhead per interview. InterviewHistory keeps one typed array per field
+instead: timestamps, ids into a process-wide table of case names, scores
+and one array per breakdown dimension, about 22 bytes per interview.
+Timestamps encode the entry's wall-clock date as if it were UTC, so it
+reads back unchanged across DST transitions. Free-text feedback is unique
+per interview, so it stays in a plain per-history list rather than the
+shared table. Entries are still read back as the familiar dicts, built on
+demand.
+"""
+import calendar
+import datetime
+import threading
+from array import array
+from storage import BREAKDOWN_KEYS
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class _InternTable:
+    """Case names shared by every session in the process, addressed by small ints."""
+
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def id(self, value):
+        try:
+            return self._ids[value]
+        except KeyError:
+            with self._lock:
+                if value not in self._ids:
+                    self._ids[value] = len(self._values)
+                    self._values.append(value)
+                return self._ids[value]
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+
+_case_names = _InternTable()
+
+
+class InterviewHistory:
+    """Interviews in date order, stored column by column. Indexing yields entry dicts."""
+
+    def __init__(self, entries=()):
+        self.timestamps = array('I')  # wall-clock date as epoch seconds, UTC
+        self.case_ids = array('I')
+        self.scores = array('h')
+        self.breakdowns = {key: array('f') for key in BREAKDOWN_KEYS}
+        self.feedback = []  # str or None, one per interview
+        self.extend(entries)
+
+    def _columns(self):
+        return [self.timestamps, self.case_ids, self.scores, *self.breakdowns.values(), self.feedback]
+
+    @staticmethod
+    def _row(entry):
+        breakdown = entry['breakdown']
+        return [
+            calendar.timegm(datetime.datetime.strptime(entry['date'], DATE_FORMAT).timetuple()),
+            _case_names.id(entry['case']),
+            entry['score'],
+            *(breakdown.get(key, 0) for key in BREAKDOWN_KEYS),
+            entry['feedback'],
+        ]
+
+    def append(self, entry):
+        for column, value in zip(self._columns(), self._row(entry)):
+            column.append(value)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def prepend(self, entries):
+        """Inserts older entries (oldest first) ahead of the current ones."""
+        older = InterviewHistory(entries)
+        for column, new in zip(self._columns(), older._columns()):
+            column[:0] = new
+
+    def entry(self, index):
+        return {
+            "date": datetime.datetime.fromtimestamp(self.timestamps[index], datetime.timezone.utc).strftime(DATE_FORMAT),
+            "case": _case_names[self.case_ids[index]],
+            "feedback": self.feedback[index],
+            "score": self.scores[index],
+            "breakdown": {key: _number(values[index]) for key, values in self.breakdowns.items()},
+        }
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            part = InterviewHistory()
+            for column, source in zip(part._columns(), self._columns()):
+                column.extend(source[index])
+            return part
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("interview history index out of range")
+        return self.entry(index)
+
+    def __iter__(self):
+        return (self.entry(i) for i in range(len(self)))
+
+    def nbytes(self):
+        """Bytes held by the array columns (feedback strings and the shared case-name table excluded)."""
+        return sum(column.itemsize * len(column) for column in self._columns() if isinstance(column, array))
+
+
+def _number(value):
+    # float32 breakdowns come back as ints when they were whole
+    return int(value) if value.is_integer() else round(value, 2)
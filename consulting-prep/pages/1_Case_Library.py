@@ -1,5 +1,6 @@
 import streamlit as st
 from utils import load_css
+from shared import CASES
 
 # Page Configuration
 st.set_page_config(
@@ -85,67 +86,9 @@ with col1:
 with col2:
     sort_opt = st.selectbox("Sort by", ["Most Popular", "Newest", "Hardest"], label_visibility="collapsed")
 
-# Case Grid Data
-all_cases = [
-    {
-        "title": "PharmaCo Growth Strategy",
-        "desc": "Assessing market entry options for a new drug in the European market.",
-        "tags": [("Healthcare", "tag-health"), ("Intermediate", "tag-difficulty")],
-        "difficulty": "Intermediate",
-        "industry": "Healthcare",
-        "type": "Growth Strategy",
-        "time": "20 min"
-    },
-    {
-        "title": "Tech Startup Profitability",
-        "desc": "Identifying key drivers of declining profits for a SaaS company.",
-        "tags": [("Technology", "tag-tech"), ("Advanced", "tag-difficulty")],
-        "difficulty": "Advanced",
-        "industry": "Technology",
-        "type": "Profitability",
-        "time": "25 min"
-    },
-    {
-        "title": "Retail Chain Expansion",
-        "desc": "Should a coffee chain expand into the Asian market? Market sizing exercise.",
-        "tags": [("Consumer Goods", "tag-consumer"), ("Beginner", "tag-difficulty")],
-        "difficulty": "Beginner",
-        "industry": "Consumer Goods",
-        "type": "Market Entry",
-        "time": "15 min"
-    },
-    {
-        "title": "Airline M&A Analysis",
-        "desc": "Evaluating the potential acquisition of a low-cost carrier by a legacy airline.",
-        "tags": [("Finance", "tag-finance"), ("Advanced", "tag-difficulty")],
-        "difficulty": "Advanced",
-        "industry": "Finance",
-        "type": "M&A",
-        "time": "30 min"
-    },
-    {
-        "title": "Social Media App Launch",
-        "desc": "Estimate the market size for a new niche social media application in the US.",
-        "tags": [("Technology", "tag-tech"), ("Beginner", "tag-difficulty")],
-        "difficulty": "Beginner",
-        "industry": "Technology",
-        "type": "Market Entry",
-        "time": "15 min"
-    },
-    {
-        "title": "EV Manufacturer Cost Reduction",
-        "desc": "Identify opportunities to reduce production costs for an electric vehicle.",
-        "tags": [("Automotive", "tag-tech"), ("Intermediate", "tag-difficulty")],
-        "difficulty": "Intermediate",
-        "industry": "Technology", # Mapped Automotive to Tech/Energy broadly or keep separate
-        "type": "Profitability",
-        "time": "20 min"
-    }
-]
-
 # Filter Logic
 filtered_cases = []
-for case in all_cases:
+for case in CASES:
     # 1. Search
     if search_query and search_query.lower() not in case['title'].lower() and search_query.lower() not in case['desc'].lower():
         continue
@@ -179,5 +122,5 @@ else:
             """, unsafe_allow_html=True)
             
             if st.button(f"Start Case", key=f"btn_{i}", use_container_width=True):
-                st.session_state['selected_case'] = case
+                st.session_state['selected_case'] = case['title']
                 st.switch_page("pages/2_Active_Case.py")
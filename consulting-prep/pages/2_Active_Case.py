@@ -3,6 +3,7 @@ import time
 import random
 from utils import load_css
 from backend import SessionManager
+from shared import get_case, get_model
 
 st.set_page_config(page_title="Active Case", page_icon="⏱️", layout="wide")
 load_css()
@@ -12,9 +13,9 @@ SessionManager.init_session()
 # --- Configuration ---
 STAGES = ["Introduction", "Framework", "Market Sizing", "Brainstorming", "Conclusion"]
 
-# Load Case Context from Session State or Default
-if 'selected_case' in st.session_state:
-    selected = st.session_state['selected_case']
+# Load Case Context from the catalog (the session only keeps the title) or Default
+selected = get_case(st.session_state.get('selected_case'))
+if selected:
     CASE_CONTEXT = {
         "company": selected['title'],
         "industry": selected['industry'],
@@ -46,7 +47,7 @@ if "current_case_title" not in st.session_state or st.session_state.current_case
     st.session_state.current_case_title = CASE_CONTEXT['company']
     
     # Initial Message
-    welcome_msg = f"Hello Tanvi. I'm the Case Lead. We are looking at '{CASE_CONTEXT['company']}', a {CASE_CONTEXT['industry']} company. \n\n**Situation**: {CASE_CONTEXT['problem']}.\n\nTake a moment to gather your thoughts. When ready, ask any clarifying questions."
+    welcome_msg = f"Hello {SessionManager.display_name()}. I'm the Case Lead. We are looking at '{CASE_CONTEXT['company']}', a {CASE_CONTEXT['industry']} company. \n\n**Situation**: {CASE_CONTEXT['problem']}.\n\nTake a moment to gather your thoughts. When ready, ask any clarifying questions."
     st.session_state.case_state["messages"].append({"role": "assistant", "content": welcome_msg})
 
 if "case_state" not in st.session_state:
@@ -86,34 +87,21 @@ def get_stage_prompt(stage_name):
     return prompts.get(stage_name, "")
 
 # --- Gemini AI Engine ---
-import google.generativeai as genai
-
 class CaseBrain:
-    def __init__(self):
-        self.api_key = None
-        self.model = None
-        self.model_id = "gemini-2.5-flash" # Updated to available model
+    def __init__(self, candidate):
+        self.candidate = candidate
         self.history_buffer = [] 
-        
-        # Try to load API Key
-        try:
-            if "GEMINI_API_KEY" in st.secrets:
-                self.api_key = st.secrets["GEMINI_API_KEY"]
-            elif "general" in st.secrets and "GEMINI_API_KEY" in st.secrets["general"]:
-                self.api_key = st.secrets["general"]["GEMINI_API_KEY"]
-                
-            if self.api_key:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-flash')
-        except Exception as e:
-            print(f"API Init Error: {e}")
-            
         self.score_card = {
             "Structure": 50,
             "Analysis": 50,
             "Communication": 50
         }
 
+    @property
+    def model(self):
+        # One client per server process, shared by every session
+        return get_model()
+
     def generate_response(self, user_input, stage):
         """
         Generates a response using Gemini.
@@ -133,7 +121,7 @@ class CaseBrain:
                 Current Stage: {stage}.
                 
                 Your Goal:
-                - Guide the candidate (Tanvi) through the case.
+                - Guide the candidate ({self.candidate}) through the case.
                 - Be professional, encouraging, but rigorous.
                 - Do NOT give the answer away. Ask guiding questions.
                 - If they ask for data, provide it ONLY if it fits the current stage.
@@ -186,7 +174,7 @@ class CaseBrain:
             context = "\n".join(self.history_buffer)
             prompt = f"""
             Analyze the following case interview transcript for AeroWidget Inc.
-            Candidate: Tanvi.
+            Candidate: {self.candidate}.
             
             Transcript:
             {context}
@@ -221,7 +209,7 @@ class CaseBrain:
 
 # Initialize Brain
 if "brain" not in st.session_state:
-    st.session_state.brain = CaseBrain()
+    st.session_state.brain = CaseBrain(SessionManager.display_name())
 
 def generate_response(user_input, stage):
     """Proxy function to call the brain."""
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from utils import load_css
+from analytics import SKILLS
 from backend import SessionManager
 
 st.set_page_config(page_title="My Performance", page_icon="📈", layout="wide")
@@ -58,44 +59,36 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-st.title("McKinsey Retail Growth Strategy")
-st.caption("Completed: October 26, 2023")
+analytics = SessionManager.get_analytics()
+if not analytics['count']:
+    st.title("My Performance")
+    st.info("Complete a case to see your scores here.")
+    st.stop()
 
-# Score Overview
-c1, c2, c3, c4 = st.columns(4)
-with c1:
-    st.markdown("""
-    <div class="score-card">
-        <div class="score-label">Overall Score</div>
-        <div class="score-val">82/100</div>
-        <div class="score-change pos">+5% vs. avg</div>
-    </div>
-    """, unsafe_allow_html=True)
-with c2:
-    st.markdown("""
-    <div class="score-card">
-        <div class="score-label">Problem Structuring</div>
-        <div class="score-val">90%</div>
-        <div class="score-change pos">+8% vs. avg</div>
-    </div>
-    """, unsafe_allow_html=True)
-with c3:
-    st.markdown("""
-    <div class="score-card">
-        <div class="score-label">Quantitative Analysis</div>
-        <div class="score-val">65%</div>
-        <div class="score-change neg">-3% vs. avg</div>
-    </div>
-    """, unsafe_allow_html=True)
-with c4:
-    st.markdown("""
+latest = analytics['latest']
+vs_avg = analytics['latest_vs_average']
+st.title(latest['case'])
+st.caption(f"Completed: {latest['date']}")
+
+def score_card(label, value, delta, suffix="%"):
+    """Latest-case score with its difference from the user's average."""
+    css = "pos" if (delta or 0) >= 0 else "neg"
+    st.markdown(f"""
     <div class="score-card">
-        <div class="score-label">Communication</div>
-        <div class="score-val">95%</div>
-        <div class="score-change pos">+2% vs. avg</div>
+        <div class="score-label">{label}</div>
+        <div class="score-val">{value:g}{suffix}</div>
+        <div class="score-change {css}">{delta or 0:+g}% vs. avg</div>
     </div>
     """, unsafe_allow_html=True)
 
+# Score Overview: the latest case against this user's average
+c1, c2, c3, c4 = st.columns(4)
+with c1:
+    score_card("Overall Score", latest['score'], vs_avg['score'], suffix="/100")
+for col, key in zip([c2, c3, c4], ["Structure", "Analysis", "Communication"]):
+    with col:
+        score_card(SKILLS[key], latest[key] or 0, vs_avg[key])
+
 st.markdown("---")
 
 col_skills, col_actions = st.columns([1, 1])
@@ -107,9 +100,7 @@ with col_skills:
     colors = {
         'Problem Structuring': '#6C63FF',
         'Quantitative Analysis': '#FF9F0A',
-        'Business Acumen': '#00F260',
-        'Communication': '#64D2FF',
-        'Synthesis': '#FF4B4B'
+        'Communication': '#64D2FF'
     }
     
     for skill, score in skills.items():
@@ -152,3 +143,14 @@ with col_actions:
         <button style="background: #2B2B40; color: #6C63FF; border: 1px solid #6C63FF; padding: 5px 10px; border-radius: 4px;">Watch Now</button>
     </div>
     """, unsafe_allow_html=True)
+
+st.markdown("---")
+st.markdown("### Interview History")
+
+for entry in reversed(SessionManager.get_history()):
+    with st.expander(f"{entry['date']} · {entry['case']} · {entry['score']}/100"):
+        st.caption(" · ".join(f"{SKILLS[key]}: {value}" for key, value in entry['breakdown'].items() if key in SKILLS))
+        st.markdown(entry['feedback'] or "_No feedback recorded._")
+
+if SessionManager.has_older_history():
+    st.button("Load older interviews", on_click=SessionManager.load_more_history)
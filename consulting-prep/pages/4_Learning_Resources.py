@@ -1,18 +1,10 @@
 import streamlit as st
 from utils import load_css
-import os
+from shared import load_markdown
 
 st.set_page_config(page_title="Learning Resources", page_icon="📖", layout="wide")
 load_css()
 
-# --- Content Loading Helper ---
-def load_markdown(filename):
-    try:
-        with open(os.path.join("consulting-prep/content", filename), "r") as f:
-            return f.read()
-    except FileNotFoundError:
-        return "Content not found."
-
 # --- State Management for Navigation ---
 if "viewing_resource" not in st.session_state:
     st.session_state.viewing_resource = None
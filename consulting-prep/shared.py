@@ -0,0 +1,105 @@
+"""
+Read-mostly resources shared by every session on the server: the case
+catalog, learning content and the interviewer model client. Each is built
+once per process; sessions keep only keys into them (a case title, a file
+name), so per-session memory does not grow with the catalog.
+"""
+import os
+import streamlit as st
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+
+MODEL_ID = "gemini-2.5-flash"
+
+CASES = [
+    {
+        "title": "PharmaCo Growth Strategy",
+        "desc": "Assessing market entry options for a new drug in the European market.",
+        "tags": [("Healthcare", "tag-health"), ("Intermediate", "tag-difficulty")],
+        "difficulty": "Intermediate",
+        "industry": "Healthcare",
+        "type": "Growth Strategy",
+        "time": "20 min"
+    },
+    {
+        "title": "Tech Startup Profitability",
+        "desc": "Identifying key drivers of declining profits for a SaaS company.",
+        "tags": [("Technology", "tag-tech"), ("Advanced", "tag-difficulty")],
+        "difficulty": "Advanced",
+        "industry": "Technology",
+        "type": "Profitability",
+        "time": "25 min"
+    },
+    {
+        "title": "Retail Chain Expansion",
+        "desc": "Should a coffee chain expand into the Asian market? Market sizing exercise.",
+        "tags": [("Consumer Goods", "tag-consumer"), ("Beginner", "tag-difficulty")],
+        "difficulty": "Beginner",
+        "industry": "Consumer Goods",
+        "type": "Market Entry",
+        "time": "15 min"
+    },
+    {
+        "title": "Airline M&A Analysis",
+        "desc": "Evaluating the potential acquisition of a low-cost carrier by a legacy airline.",
+        "tags": [("Finance", "tag-finance"), ("Advanced", "tag-difficulty")],
+        "difficulty": "Advanced",
+        "industry": "Finance",
+        "type": "M&A",
+        "time": "30 min"
+    },
+    {
+        "title": "Social Media App Launch",
+        "desc": "Estimate the market size for a new niche social media application in the US.",
+        "tags": [("Technology", "tag-tech"), ("Beginner", "tag-difficulty")],
+        "difficulty": "Beginner",
+        "industry": "Technology",
+        "type": "Market Entry",
+        "time": "15 min"
+    },
+    {
+        "title": "EV Manufacturer Cost Reduction",
+        "desc": "Identify opportunities to reduce production costs for an electric vehicle.",
+        "tags": [("Automotive", "tag-tech"), ("Intermediate", "tag-difficulty")],
+        "difficulty": "Intermediate",
+        "industry": "Technology", # Mapped Automotive to Tech/Energy broadly or keep separate
+        "type": "Profitability",
+        "time": "20 min"
+    }
+]
+
+CASES_BY_TITLE = {case['title']: case for case in CASES}
+
+
+def get_case(title):
+    """Catalog entry for a case title, or None."""
+    return CASES_BY_TITLE.get(title)
+
+
+@st.cache_data(max_entries=64)
+def load_markdown(filename):
+    try:
+        with open(os.path.join(CONTENT_DIR, filename), "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        return "Content not found."
+
+
+@st.cache_resource
+def get_model():
+    """The Gemini client, configured once per process; None without an API key."""
+    import google.generativeai as genai
+
+    try:
+        api_key = None
+        if "GEMINI_API_KEY" in st.secrets:
+            api_key = st.secrets["GEMINI_API_KEY"]
+        elif "general" in st.secrets and "GEMINI_API_KEY" in st.secrets["general"]:
+            api_key = st.secrets["general"]["GEMINI_API_KEY"]
+
+        if api_key:
+            genai.configure(api_key=api_key)
+            return genai.GenerativeModel(MODEL_ID)
+    except Exception as e:
+        print(f"API Init Error: {e}")
+    return None
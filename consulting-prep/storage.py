@@ -0,0 +1,250 @@
+"""
+Embedded SQLite persistence for user progress.
+
+Reads go straight to SQLite. Writes are queued and applied by a background
+thread in batched transactions, so a save returns immediately and never
+holds up a Streamlit rerun. A statement that fails is reported and dropped
+on its own; the rest of its batch still commits. Call `flush()` when a
+write must be on disk before continuing (tests, shutdown).
+
+    CONSULTPREP_DB   database path (default: consultprep.sqlite next to this file)
+"""
+import atexit
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'consultprep.sqlite')
+
+# Interview rows returned per history page
+HISTORY_PAGE_SIZE = 20
+
+# Score breakdown categories summed per user
+BREAKDOWN_KEYS = ("Structure", "Analysis", "Communication")
+
+# PBKDF2-SHA256 rounds for stored passwords
+PASSWORD_ITERATIONS = 200_000
+
+# Queued writes applied per transaction, and how long the writer waits to fill a batch
+BATCH_SIZE = 100
+BATCH_WAIT = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user TEXT PRIMARY KEY,
+    xp INTEGER NOT NULL DEFAULT 0,
+    password_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS interviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    date TEXT NOT NULL,
+    case_name TEXT NOT NULL,
+    feedback TEXT,
+    score INTEGER NOT NULL,
+    breakdown TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interviews_user_date ON interviews (user, date);
+CREATE TABLE IF NOT EXISTS modules (
+    user TEXT NOT NULL,
+    module TEXT NOT NULL,
+    PRIMARY KEY (user, module)
+);
+"""
+
+
+class ProgressStore:
+    """Per-user XP, completed modules and interview history, with write-behind batching."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+        self._writes = queue.Queue()
+        # Interviews queued / applied per user by this process; the queued count is the history version
+        self._history_queued = {}
+        self._history_applied = {}
+        self._history_applied_changed = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="progress-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Sign-in
+
+    def authenticate(self, user, password):
+        """
+        True when `password` is the user's. A new name is registered with
+        this password. Written synchronously, so two sessions can't both
+        register a name.
+        """
+        if not password:
+            return False
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT INTO users (user, password_hash) VALUES (?, ?) ON CONFLICT (user) DO NOTHING",
+                         (user, hash_password(password)))
+        (stored,) = conn.execute("SELECT password_hash FROM users WHERE user = ?", (user,)).fetchone()
+        return verify_password(password, stored)
+
+    # Write-behind
+
+    def _enqueue(self, sql, params, history_user=None):
+        self._writes.put((sql, params, history_user))
+
+    def _write_loop(self):
+        while True:
+            batch = [self._writes.get()]
+            try:
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self._writes.get(timeout=BATCH_WAIT))
+            except queue.Empty:
+                pass
+
+            try:
+                self._apply(batch)
+            except sqlite3.Error:
+                # The failed transaction rolled back every statement; replay them one
+                # at a time so only the bad one is lost
+                for statement in batch:
+                    try:
+                        self._apply([statement])
+                    except sqlite3.Error as e:
+                        print(f"Progress store write dropped: {statement[0]} {statement[1]!r}: {e}")
+            finally:
+                with self._history_applied_changed:
+                    for _, _, history_user in batch:
+                        if history_user is not None:
+                            self._history_applied[history_user] = self._history_applied.get(history_user, 0) + 1
+                    self._history_applied_changed.notify_all()
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _apply(self, statements):
+        """Runs the statements in one transaction."""
+        with self._connect() as conn:
+            for sql, params, _ in statements:
+                conn.execute(sql, params)
+
+    def flush(self):
+        """Blocks until every queued write has been committed."""
+        self._writes.join()
+
+    def add_xp(self, user, amount):
+        self._enqueue("INSERT INTO users (user, xp) VALUES (?, ?) "
+                      "ON CONFLICT (user) DO UPDATE SET xp = xp + excluded.xp", (user, amount))
+
+    def add_module(self, user, module):
+        self._enqueue("INSERT OR IGNORE INTO modules (user, module) VALUES (?, ?)", (user, module))
+
+    def add_interview(self, user, entry):
+        with self._history_applied_changed:
+            self._history_queued[user] = self._history_queued.get(user, 0) + 1
+        self._enqueue(
+            "INSERT INTO interviews (user, date, case_name, feedback, score, breakdown) VALUES (?, ?, ?, ?, ?, ?)",
+            (user, entry["date"], entry["case"], entry["feedback"], entry["score"], json.dumps(entry["breakdown"])),
+            history_user=user,
+        )
+
+    def history_version(self, user):
+        """
+        Interviews queued for the user by this process, bumped as each is
+        queued (no I/O). Any session adding a case changes it, so it keys
+        caches over the user's history; pair it with wait_for_history()
+        before reading the rows.
+        """
+        return self._history_queued.get(user, 0)
+
+    def wait_for_history(self, user, version):
+        """Blocks until the user's first `version` queued interviews are applied; other users' writes don't hold it up."""
+        with self._history_applied_changed:
+            self._history_applied_changed.wait_for(lambda: self._history_applied.get(user, 0) >= version)
+
+    # Reads
+
+    def profile(self, user, recent=10):
+        """
+        {xp, completed_modules, cases_completed, score_total, breakdown_totals,
+        recent_scores} for a user (zeros if unknown); recent_scores is oldest first.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT xp FROM users WHERE user = ?", (user,)).fetchone()
+        modules = [module for (module,) in conn.execute("SELECT module FROM modules WHERE user = ? ORDER BY rowid", (user,))]
+        sums = ", ".join(f"COALESCE(SUM(json_extract(breakdown, '$.{key}')), 0)" for key in BREAKDOWN_KEYS)
+        count, total, *breakdown = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(score), 0), {sums} FROM interviews WHERE user = ?", (user,)
+        ).fetchone()
+        scores = [score for (score,) in conn.execute(
+            "SELECT score FROM interviews WHERE user = ? ORDER BY date DESC, id DESC LIMIT ?", (user, recent))]
+        return {
+            "xp": row[0] if row else 0,
+            "completed_modules": modules,
+            "cases_completed": count,
+            "score_total": total,
+            "breakdown_totals": dict(zip(BREAKDOWN_KEYS, breakdown)),
+            "recent_scores": scores[::-1],
+        }
+
+    def history(self, user):
+        """Every interview for a user, oldest first."""
+        rows = self._connect().execute(
+            "SELECT date, case_name, feedback, score, breakdown FROM interviews WHERE user = ? ORDER BY date, id", (user,)
+        )
+        return [_entry(*row) for row in rows]
+
+    def score_rows(self, user):
+        """(date, case_name, score, *breakdown) tuples for every interview, oldest first."""
+        columns = ", ".join(f"json_extract(breakdown, '$.{key}')" for key in BREAKDOWN_KEYS)
+        return self._connect().execute(
+            f"SELECT date, case_name, score, {columns} FROM interviews WHERE user = ? ORDER BY date, id", (user,)
+        ).fetchall()
+
+    def history_page(self, user, before=None, page_size=HISTORY_PAGE_SIZE):
+        """
+        One page of interviews older than the `before` cursor (None for the
+        newest), newest first, in the session's entry format. Returns
+        (entries, cursor for the next page). Keyset paging, so rows saved
+        in the meantime never shift the pages.
+        """
+        sql = "SELECT id, date, case_name, feedback, score, breakdown FROM interviews WHERE user = ?"
+        params = [user]
+        if before is not None:
+            sql += " AND (date, id) < (?, ?)"
+            params += list(before)
+        rows = self._connect().execute(sql + " ORDER BY date DESC, id DESC LIMIT ?", (*params, page_size)).fetchall()
+        entries = [_entry(*row[1:]) for row in rows]
+        cursor = (rows[-1][1], rows[-1][0]) if rows else before
+        return entries, cursor
+
+
+def _entry(date, case_name, feedback, score, breakdown):
+    """An interviews row in the session's entry format."""
+    return {"date": date, "case": case_name, "feedback": feedback, "score": score, "breakdown": json.loads(breakdown)}
+
+
+def hash_password(password, salt=None, iterations=PASSWORD_ITERATIONS):
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    try:
+        _, iterations, salt, expected = stored.split('$')
+        candidate = hash_password(password, bytes.fromhex(salt), int(iterations))
+    except (AttributeError, ValueError):
+        return False
+    return hmac.compare_digest(candidate.split('$')[-1], expected)
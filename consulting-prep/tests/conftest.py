@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The app imports its modules as top-level names (streamlit runs it from consulting-prep/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import ProgressStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProgressStore(str(tmp_path / "progress.sqlite"))
+
+
+def make_entry(i, **overrides):
+    """A distinct interview entry; entries with a larger i are newer."""
+    entry = {
+        "date": f"2026-09-{1 + i // 24:02d} {i % 24:02d}:00",
+        "case": f"Case {i % 7}",
+        "feedback": None if i % 3 == 0 else f"Feedback {i}",
+        "score": 50 + i % 50,
+        "breakdown": {"Structure": 5 + i % 5, "Analysis": 4 + i % 6, "Communication": 6 + (i % 4) / 2},
+    }
+    entry.update(overrides)
+    return entry
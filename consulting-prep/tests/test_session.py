@@ -0,0 +1,66 @@
+from streamlit.testing.v1 import AppTest
+
+from backend import RunningStats
+from conftest import make_entry
+
+INTERVIEWS = 30
+
+
+def test_running_stats_match_stats_rebuilt_from_store(store):
+    running = RunningStats()
+    for i in range(INTERVIEWS):
+        entry = make_entry(i)
+        store.add_interview("ana", entry)
+        running.add(entry)
+    store.flush()
+
+    assert RunningStats.from_history(store.history("ana")) == running
+    profile = store.profile("ana")
+    seeded = RunningStats(profile["cases_completed"], profile["score_total"],
+                          profile["breakdown_totals"], profile["recent_scores"])
+    assert seeded == running
+
+
+def _session_script():
+    import streamlit as st
+    from backend import SessionManager, get_store
+    from conftest import make_entry
+
+    SessionManager.init_session()
+    if not st.session_state.get("saved"):
+        for i in range(st.session_state["interviews"]):
+            entry = make_entry(i)
+            SessionManager.save_interview(entry["case"], entry["feedback"], score=entry["breakdown"])
+        st.session_state["saved"] = True
+    if st.session_state.get("tamper"):
+        st.session_state["interview_stats"].score_total += 1
+    st.session_state["drifted"] = SessionManager.rebuild_stats()
+    st.session_state["stored_xp"] = get_store().profile(SessionManager.current_user())["xp"]
+
+
+def _run_session(tmp_path, monkeypatch, **state):
+    from backend import get_store
+    monkeypatch.setenv("CONSULTPREP_DB", str(tmp_path / "session.sqlite"))
+    get_store.clear()
+    app = AppTest.from_function(_session_script)
+    app.session_state["user_identity"] = "ana"
+    for key, value in state.items():
+        app.session_state[key] = value
+    app.run(timeout=30)
+    assert not app.exception
+    return app
+
+
+def test_rebuild_stats_finds_no_drift_after_saves(tmp_path, monkeypatch):
+    app = _run_session(tmp_path, monkeypatch, interviews=INTERVIEWS)
+    assert app.session_state["drifted"] is False
+    assert app.session_state["interview_stats"].count == INTERVIEWS
+    assert app.session_state["stored_xp"] == 100 * INTERVIEWS
+
+
+def test_rebuild_stats_repairs_drift(tmp_path, monkeypatch):
+    app = _run_session(tmp_path, monkeypatch, interviews=5, tamper=True)
+    assert app.session_state["drifted"] is True
+    app.session_state["tamper"] = False
+    app.run(timeout=30)
+    assert app.session_state["drifted"] is False
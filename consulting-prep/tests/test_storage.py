@@ -0,0 +1,76 @@
+import pytest
+
+from conftest import make_entry
+from storage import HISTORY_PAGE_SIZE, hash_password, verify_password
+
+
+def test_authenticate_registers_then_checks(store):
+    assert store.authenticate("ana", "s3cret")
+    assert store.authenticate("ana", "s3cret")
+    assert not store.authenticate("ana", "wrong")
+    assert not store.authenticate("ana", "")
+    assert store.authenticate("ben", "other")
+
+
+def test_authenticate_rejects_empty_password_for_new_user(store):
+    assert not store.authenticate("cy", "")
+    # The empty attempt didn't register the name
+    assert store.authenticate("cy", "real")
+
+
+def test_password_hash_round_trip():
+    stored = hash_password("pw")
+    assert stored.startswith("pbkdf2_sha256$")
+    assert verify_password("pw", stored)
+    assert not verify_password("pw2", stored)
+    assert not verify_password("pw", None)
+
+
+def test_history_page_walks_every_interview_once(store):
+    entries = [make_entry(i) for i in range(2 * HISTORY_PAGE_SIZE + 5)]
+    for entry in entries:
+        store.add_interview("ana", entry)
+    store.add_interview("ben", make_entry(0))
+    store.flush()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.history_page("ana", cursor)
+        if not page:
+            break
+        if not seen:
+            # Saved after the first page was read: must not shift the later pages
+            store.add_interview("ana", make_entry(999, date="2026-12-31 23:00"))
+            store.flush()
+        seen.extend(page)
+    assert seen == entries[::-1]
+
+
+def test_history_is_oldest_first_and_keeps_none_feedback(store):
+    entries = [make_entry(i) for i in range(10)]
+    for entry in reversed(entries):
+        store.add_interview("ana", entry)
+    store.flush()
+    assert store.history("ana") == entries
+    assert store.history("ana")[0]["feedback"] is None
+
+
+def test_failed_write_only_drops_itself(store):
+    store.add_xp("ana", 10)
+    store.add_interview("ben", make_entry(1, feedback={"not": "text"}))
+    store.add_xp("ana", 5)
+    store.add_interview("ben", make_entry(2))
+    store.flush()
+    assert store.profile("ana")["xp"] == 15
+    assert store.profile("ben")["cases_completed"] == 1
+
+
+def test_history_version_counts_queued_interviews(store):
+    assert store.history_version("ana") == 0
+    store.add_interview("ana", make_entry(1))
+    store.add_interview("ana", make_entry(2, feedback={"not": "text"}))
+    store.add_xp("ana", 100)
+    assert store.history_version("ana") == 2
+    # Returns once both are applied, including the one that was dropped
+    store.wait_for_history("ana", 2)
+    assert [row[2] for row in store.score_rows("ana")] == [make_entry(1)["score"]]
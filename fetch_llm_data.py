@@ -1,20 +1,66 @@
 import os
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from llm_cache import LLM_CACHE_ENABLED, LLM_CACHE_ONLY, LLMCache, prompt_hash
 
 # Load environment variables
 load_dotenv()
 
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+# Override to point at a local stub server when testing
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
+PERPLEXITY_MODEL = os.getenv("PERPLEXITY_MODEL", "sonar-pro")
 
-def fetch_from_perplexity(ticker):
-    print(f"Fetching {ticker} data from Perplexity...")
-    
-    url = "https://api.perplexity.ai/chat/completions"
-    
-    payload = {
-        "model": "sonar-pro",
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # requests in flight at once
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))  # seconds, doubled per attempt
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# One keep-alive connection pool shared by every request
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=LLM_CONCURRENCY))
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=LLM_CONCURRENCY))
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff; a server-supplied Retry-After wins."""
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+def post_with_retry(url, payload, headers):
+    """POSTs on the shared session, retrying 429/5xx and connection errors with backoff."""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        last_attempt = attempt == LLM_MAX_RETRIES
+        try:
+            response = session.post(url, json=payload, headers=headers,
+                                    timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"Perplexity request failed ({e}), retrying in {delay:.1f}s...")
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+            print(f"Perplexity returned {response.status_code}, retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+def build_payload(ticker):
+    return {
+        "model": PERPLEXITY_MODEL,
         "messages": [
             {
                 "role": "system",
@@ -26,6 +72,26 @@ def fetch_from_perplexity(ticker):
             }
         ]
     }
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def validate_llm_data(data):
+    """Keeps the fields generate_data_js uses, or returns None if the response is unusable."""
+    if not isinstance(data, dict) or not _is_number(data.get('price')):
+        return None
+    cleaned = {"price": data['price']}
+    if _is_number(data.get('marketCap')):
+        cleaned['marketCap'] = data['marketCap']
+    if isinstance(data.get('analysis'), str):
+        cleaned['analysis'] = data['analysis']
+    return cleaned
+
+def fetch_from_perplexity(ticker, payload=None):
+    print(f"Fetching {ticker} data from Perplexity...")
+    
+    url = PERPLEXITY_API_URL
+    payload = payload or build_payload(ticker)
     
     headers = {
         "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
@@ -33,7 +99,7 @@ def fetch_from_perplexity(ticker):
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = post_with_retry(url, payload, headers)
         if response.status_code != 200:
             print(f"Perplexity Error ({response.status_code}): {response.text}")
         response.raise_for_status()
@@ -41,15 +107,42 @@ def fetch_from_perplexity(ticker):
         content = result['choices'][0]['message']['content']
         # Clean markdown if present
         content = content.replace('```json', '').replace('```', '').strip()
-        return json.loads(content)
+        data = validate_llm_data(json.loads(content))
+        if data is None:
+            print(f"Perplexity returned unusable data for {ticker}: {content}")
+        return data
     except Exception as e:
         print(f"Perplexity Exception: {e}")
         return None
 
+cache = LLMCache() if LLM_CACHE_ENABLED or LLM_CACHE_ONLY else None
+
 def fetch_llm_data(ticker):
-    if PERPLEXITY_API_KEY:
-        return fetch_from_perplexity(ticker)
-    return None
+    payload = build_payload(ticker)
+    prompt = prompt_hash(payload)
+
+    if cache is not None:
+        if LLM_CACHE_ONLY:
+            return cache.latest(ticker, prompt, PERPLEXITY_MODEL)
+        cached = cache.get(ticker, prompt, PERPLEXITY_MODEL)
+        if cached is not None:
+            print(f"Using cached Perplexity data for {ticker}")
+            return cached
+
+    if not PERPLEXITY_API_KEY:
+        return None
+    data = fetch_from_perplexity(ticker, payload)
+    if data is not None and cache is not None:
+        cache.put(ticker, prompt, PERPLEXITY_MODEL, data)
+    return data
+
+def fetch_llm_data_many(tickers, max_workers=LLM_CONCURRENCY):
+    """fetch_llm_data for several tickers concurrently; returns {ticker: data or None}."""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(tickers, pool.map(fetch_llm_data, tickers)))
 
 if __name__ == "__main__":
     # Test
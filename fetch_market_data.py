@@ -1,6 +1,14 @@
-import yfinance as yf
+import os
+import sys
 import json
-import time
+import math
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from indicators import IndicatorState
+import pandas as pd
+from market_providers import get_provider
+from price_store import daily_frame, get_price_store, write_store
+from rate_limit import TokenBucket
 
 # Main Tickers and their Peers
 TICKERS = {
@@ -10,44 +18,298 @@ TICKERS = {
     'NKE': ['ADS.DE', 'LULU'] # Added Nike as per user mention
 }
 
-def fetch_live_data():
+# Concurrency and upstream rate limit for snapshot fetches
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_RATE = float(os.getenv("FETCH_RATE", "5"))  # info requests per second
+
+def universe():
+    """Main tickers followed by their peers, de-duplicated in order."""
+    tickers = list(TICKERS)
+    for peers in TICKERS.values():
+        for peer in peers:
+            if peer not in tickers:
+                tickers.append(peer)
+    return tickers
+
+def fetch_snapshot(ticker, bucket, price=None):
+    """Price and key ratios for one ticker; `price` (from the bulk download) wins over info."""
+    bucket.acquire()
+    print(f"Fetching {ticker}...")
+    info = get_provider().info(ticker)
+    
+    # Extract relevant data
+    current_price = price or info.get('currentPrice', info.get('regularMarketPrice', 0))
+    market_cap = info.get('marketCap', 0)
+    trailing_pe = info.get('trailingPE', 0)
+    forward_pe = info.get('forwardPE', 0)
+    
+    # Use trailingPE if available, otherwise forwardPE, or 0
+    pe_ratio = trailing_pe if trailing_pe else forward_pe
+
+    return {
+        "price": current_price,
+        "ratios": {
+            "marketCap": market_cap,
+            "pe": pe_ratio
+        }
+    }
+
+def fetch_live_data(max_workers=FETCH_WORKERS, rate=FETCH_RATE):
     print("Fetching live market data...")
+    tickers = universe()
+
+    # One bulk download for every price
+    try:
+        prices = get_provider().prices(tickers)
+    except Exception as e:
+        print(f"Bulk price download failed, falling back to per-ticker quotes: {e}")
+        prices = {}
+
+    bucket = TokenBucket(rate, capacity=max_workers)
+    snapshots = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_snapshot, ticker, bucket, prices.get(ticker)): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                snapshots[ticker] = future.result()
+            except Exception as e:
+                print(f"Error fetching {ticker}: {e}")
+                # Fallback to the bulk price (or 0) with no ratios
+                snapshots[ticker] = {"price": prices.get(ticker, 0), "ratios": {}}
+
+    # Main tickers list their peers; peer snapshots point back at their main ticker(s)
     live_data = {}
-    
+    for ticker in tickers:
+        live_data[ticker] = snapshots[ticker]
+        if ticker in TICKERS:
+            live_data[ticker]["peers"] = TICKERS[ticker]
+        else:
+            live_data[ticker]["peerOf"] = [main for main, peers in TICKERS.items() if ticker in peers]
+    return live_data
+
+# OHLC bars kept per ticker in market_data.json (indicators use the full year)
+HISTORY_BARS = 60
+
+RATIO_FIELDS = [
+    'marketCap', 'trailingPE', 'forwardPE', 'pegRatio',
+    'priceToSalesTrailing12Months', 'enterpriseToEbitda', 'profitMargins', 'beta'
+]
+
+def _number(value):
+    """Plain float for JSON, None for missing/NaN."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+def _financial_rows(statement):
+    rows = []
+    if not statement.empty:
+        for period in statement.columns[:4]:
+            column = statement[period]
+            rows.append({
+                "year": period.year,
+                "revenue": _number(column.get('Total Revenue')),
+                "netIncome": _number(column.get('Net Income'))
+            })
+    return rows
+
+def _bar_rows(history):
+    return [
+        {
+            "date": date.strftime('%Y-%m-%d'),
+            "close": float(bar['Close']),
+            "open": float(bar['Open']),
+            "high": float(bar['High']),
+            "low": float(bar['Low'])
+        }
+        for date, bar in history.iterrows()
+    ]
+
+def _current_price(info):
+    return info.get('currentPrice', info.get('regularMarketPrice', 0))
+
+def completed_bars(history, today=None):
+    """
+    Drops today's bar: during the session it is provisional, and a stored
+    bar is never revised, so only finished sessions are kept (and fed to
+    the IndicatorState). Today's price still shows as currentPrice.
+    """
+    today = today or datetime.date.today()
+    return history[history.index < pd.Timestamp(today)]
+
+def full_snapshot(ticker, today=None):
+    """(market_data.json entry, IndicatorState, history) from a full one-year download."""
+    provider = get_provider()
+    info = provider.info(ticker)
+    history = completed_bars(daily_frame(provider.history(ticker, period='1y')), today)
+
+    state = IndicatorState.from_history(history['Close'].to_numpy() if not history.empty else [])
+    technicals = {"currentPrice": _current_price(info)}
+    technicals.update(state.indicators())
+
+    entry = {
+        "financials": _financial_rows(provider.financials(ticker)),
+        "ratios": {field: info.get(field) for field in RATIO_FIELDS},
+        "technicals": technicals,
+        "priceHistory": _bar_rows(history.tail(HISTORY_BARS))
+    }
+    return entry, state, history
+
+def fetch_ticker_snapshot(ticker):
+    """Builds one market_data.json entry: financials, ratios, technicals and recent OHLC."""
+    return full_snapshot(ticker)[0]
+
+def save_price_history(histories):
+    """Writes the given tickers' daily histories to the price store; other tickers are untouched."""
+    store = get_price_store()
+    if store is None or not histories:
+        return
+    bars = write_store(histories, store.path)
+    print(f"Wrote {bars} bars for {len(histories)} tickers to {store.path}")
+
+def build_market_data():
+    """Full rebuild; returns (market_data, indicator states) for write_market_data."""
+    print("Building market_data.json...")
+    market_data = {}
+    states = {}
+    histories = {}
+
     for ticker in TICKERS:
         try:
-            print(f"Fetching {ticker}...")
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # Extract relevant data
-            current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
-            market_cap = info.get('marketCap', 0)
-            trailing_pe = info.get('trailingPE', 0)
-            forward_pe = info.get('forwardPE', 0)
-            beta = info.get('beta', 0)
-            
-            # Financials (Mocking some if missing or complex to parse consistently)
-            # In a real robust app, we'd parse stock.financials deeply.
-            # For this demo, we'll focus on the Price and key Ratios being real.
-            
-            # Use trailingPE if available, otherwise forwardPE, or 0
-            pe_ratio = trailing_pe if trailing_pe else forward_pe
-
-            live_data[ticker] = {
-                "price": current_price,
-                "ratios": {
-                    "marketCap": market_cap,
-                    "pe": pe_ratio
-                }
-            }
-            
+            print(f"Fetching {ticker} history and financials...")
+            market_data[ticker], state, histories[ticker] = full_snapshot(ticker)
+            states[ticker] = state.to_dict()
         except Exception as e:
             print(f"Error fetching {ticker}: {e}")
-            # Fallback to 0 or skip
-            live_data[ticker] = {"price": 0, "ratios": {}}
 
-    return live_data
+    save_price_history(histories)
+    return market_data, states
+
+# Smallest download period covering a gap of N calendar days; longer gaps rebuild from scratch
+GAP_PERIODS = [(5, '5d'), (28, '1mo'), (88, '3mo'), (180, '6mo')]
+
+def period_for_gap(days):
+    for max_days, period in GAP_PERIODS:
+        if days <= max_days:
+            return period
+    return None
+
+def latest_fiscal_year(info):
+    """Fiscal year of the newest annual statement Yahoo reports, if known."""
+    timestamp = info.get('lastFiscalYearEnd')
+    if not timestamp:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).year
+
+def update_ticker_snapshot(ticker, entry, state, today=None):
+    """
+    Brings a stored entry up to date. Downloads only the completed bars
+    after the last stored date, feeds them through the saved IndicatorState, and
+    re-pulls financials only when a newer fiscal year is out. Returns
+    (entry, state, new bars frame), or None when a full rebuild is needed.
+    """
+    bars = entry.get("priceHistory") or []
+    if state is None or not bars:
+        return None
+
+    last_date = bars[-1]["date"]
+    today = today or datetime.date.today()
+    period = period_for_gap((today - datetime.date.fromisoformat(last_date)).days)
+    if period is None:
+        return None
+
+    provider = get_provider()
+    info = provider.info(ticker)
+    history = completed_bars(daily_frame(provider.history(ticker, period=period)), today)
+    history = history[history.index > pd.Timestamp(last_date)]
+    new_bars = _bar_rows(history)
+
+    for bar in new_bars:
+        state.update(bar["close"])
+    technicals = {"currentPrice": _current_price(info)}
+    technicals.update(state.indicators())
+
+    financials = entry.get("financials") or []
+    fiscal_year = latest_fiscal_year(info)
+    stored_year = max((row["year"] for row in financials), default=None)
+    if stored_year is None or (fiscal_year is not None and fiscal_year > stored_year):
+        print(f"{ticker}: new fiscal period, re-pulling financials...")
+        financials = _financial_rows(provider.financials(ticker))
+
+    updated = {
+        "financials": financials,
+        "ratios": {field: info.get(field) for field in RATIO_FIELDS},
+        "technicals": technicals,
+        "priceHistory": (bars + new_bars)[-HISTORY_BARS:]
+    }
+    return updated, state, history
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+def state_path_for(output_path):
+    """Sidecar holding each ticker's IndicatorState next to market_data.json."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.state{ext}"
+
+def update_market_data(output_path='market_data.json'):
+    """
+    Incremental counterpart of build_market_data: reuses the existing file
+    and its indicator-state sidecar so a daily run costs one short download
+    per ticker. Tickers without saved state fall back to a full snapshot.
+    Returns (market_data, indicator states) for write_market_data.
+    """
+    print(f"Updating {output_path}...")
+    market_data = _load_json(output_path, {})
+    state_path = state_path_for(output_path)
+    states = _load_json(state_path, {})
+    store = get_price_store()
+    histories = {}
+
+    for ticker in TICKERS:
+        try:
+            saved = states.get(ticker)
+            stored = store.history(ticker) if store is not None else None
+            result = None
+            if ticker in market_data and saved is not None and (store is None or stored is not None):
+                result = update_ticker_snapshot(ticker, market_data[ticker], IndicatorState.from_dict(saved))
+
+            if result is None:
+                print(f"Fetching {ticker} history and financials...")
+                entry, state, histories[ticker] = full_snapshot(ticker)
+            else:
+                entry, state, added = result
+                print(f"{ticker}: {len(added)} new bar(s)")
+                if stored is not None:
+                    histories[ticker] = pd.concat([stored, added])
+            market_data[ticker] = entry
+            states[ticker] = state.to_dict()
+        except Exception as e:
+            print(f"Error updating {ticker}: {e}")
+
+    save_price_history(histories)
+    return market_data, states
+
+def _write_json(path, data, **kwargs):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp, path)
+
+def write_market_data(data, states, output_path='market_data.json'):
+    """
+    Writes market_data.json, then its indicator-state sidecar, each
+    atomically; the sidecar is never ahead of the data it describes.
+    """
+    _write_json(output_path, data, indent=4)
+    _write_json(state_path_for(output_path), states)
+
+    print(f"Successfully generated {output_path}")
 
 def generate_js_file(data):
     js_content = f"const LIVE_MARKET_DATA = {json.dumps(data, indent=4)};"
@@ -61,3 +323,7 @@ def generate_js_file(data):
 if __name__ == "__main__":
     data = fetch_live_data()
     generate_js_file(data)
+    if '--full' in sys.argv:
+        write_market_data(*build_market_data())
+    else:
+        write_market_data(*update_market_data())
@@ -0,0 +1,145 @@
+"""
+Exports income, balance-sheet and cash-flow statements for many tickers
+into one long-format dataset: (ticker, statement, period, line_item, value).
+
+Statements are fetched concurrently under the same worker cap and rate
+limit as fetch_market_data. Runs are incremental: existing rows are kept,
+new periods are appended, restated values replace the old ones, and
+tickers whose newest stored period is less than a year old are skipped
+(pass --force to re-fetch them).
+
+    python fetch_statements.py                    # every main ticker and peer
+    python fetch_statements.py TSLA F --output statements.csv
+"""
+import argparse
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from fetch_market_data import FETCH_RATE, FETCH_WORKERS, universe
+from market_providers import get_provider
+from rate_limit import TokenBucket
+
+# statement name -> provider method
+STATEMENTS = {
+    "income": "financials",
+    "balance": "balance_sheet",
+    "cashflow": "cashflow",
+}
+KEY_COLUMNS = ["ticker", "statement", "period", "line_item"]
+COLUMNS = KEY_COLUMNS + ["value"]
+
+# A new annual statement can't be out before the newest stored one is this old
+STALE_AFTER_DAYS = 365
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+DEFAULT_OUTPUT = 'statements.parquet' if parquet_available() else 'statements.csv'
+
+
+def long_format(ticker, statement, frame):
+    """Provider statement (line items x periods) -> long rows, missing values dropped."""
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    rows = frame.rename_axis(index="line_item", columns="period").stack(future_stack=True).rename("value").reset_index()
+    rows["value"] = pd.to_numeric(rows["value"], errors='coerce')
+    rows = rows.dropna(subset=["value"])
+    rows["period"] = pd.to_datetime(rows["period"]).dt.strftime('%Y-%m-%d')
+    rows["ticker"] = ticker
+    rows["statement"] = statement
+    return rows[COLUMNS]
+
+
+def fetch_statements(ticker, bucket=None):
+    """All three statements for one ticker, in long format."""
+    provider = get_provider()
+    parts = []
+    for statement, method in STATEMENTS.items():
+        if bucket is not None:
+            bucket.acquire()
+        parts.append(long_format(ticker, statement, getattr(provider, method)(ticker)))
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_dataset(path):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={"ticker": str, "statement": str, "period": str, "line_item": str})
+
+
+def write_dataset(frame, path):
+    tmp = f"{path}.tmp"
+    if path.endswith('.parquet'):
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def tickers_due(tickers, existing, today=None, force=False):
+    """Tickers with no stored statements, or whose newest period is at least STALE_AFTER_DAYS old."""
+    if force or existing.empty:
+        return list(tickers)
+    today = today or datetime.date.today()
+    cutoff = (today - datetime.timedelta(days=STALE_AFTER_DAYS)).isoformat()
+    newest = existing.groupby("ticker")["period"].max()
+    return [ticker for ticker in tickers if newest.get(ticker, '') <= cutoff]
+
+
+def merge_rows(existing, fetched):
+    """Appends fetched rows; for duplicate keys the fetched (possibly restated) value wins."""
+    merged = pd.concat([existing, fetched], ignore_index=True)
+    merged = merged.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    return merged.sort_values(KEY_COLUMNS, ignore_index=True)
+
+
+def export_statements(tickers, output=DEFAULT_OUTPUT, max_workers=FETCH_WORKERS, rate=FETCH_RATE, force=False):
+    """Fetches the due tickers concurrently and merges them into `output`. Returns the merged frame."""
+    existing = read_dataset(output)
+    due = tickers_due(tickers, existing, force=force)
+    print(f"Fetching statements for {len(due)} of {len(tickers)} tickers...")
+
+    bucket = TokenBucket(rate, capacity=max_workers)
+    fetched = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_statements, ticker, bucket): ticker for ticker in due}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                fetched.append(future.result())
+            except Exception as e:
+                print(f"Error fetching statements for {ticker}: {e}")
+
+    if not fetched:
+        print("No new statements.")
+        return existing
+
+    merged = merge_rows(existing, pd.concat(fetched, ignore_index=True))
+    write_dataset(merged, output)
+    print(f"Wrote {len(merged)} rows ({len(merged) - len(existing)} new) to {output}")
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export income, balance-sheet and cash-flow statements in long format")
+    parser.add_argument('tickers', nargs='*', help="Tickers to export (default: every main ticker and peer)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Dataset path; .parquet needs pyarrow, anything else is CSV")
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS)
+    parser.add_argument('--force', action='store_true', help="Re-fetch tickers whose statements are recent")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] or universe()
+    export_statements(tickers, output=args.output, max_workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
-import yfinance as yf
 import pandas as pd
+from market_providers import get_provider
 
 def fetch_tesla_data():
     print("Fetching data for TSLA...")
-    ticker = yf.Ticker("TSLA")
     
     # Get financials (income statement)
     # yfinance returns a DataFrame with dates as columns and metrics as rows
-    financials = ticker.financials
+    financials = get_provider().financials("TSLA")
     
     if financials.empty:
         print("Error: No financial data found.")
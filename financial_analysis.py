@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# (yfinance line item, display label)
+KEY_METRICS = [
+    ('Total Revenue', 'Revenue'),
+    ('Net Income', 'Net Income'),
+    ('Gross Profit', 'Gross Profit'),
+    ('Operating Income', 'Operating Income')
+]
+
+# Line items expressed as a % of revenue
+MARGINS = {
+    'Gross Profit': 'Gross Margin',
+    'Operating Income': 'Operating Margin',
+    'Net Income': 'Net Margin'
+}
+
+
+def analyze_financials(financials):
+    """
+    Computes period-over-period change, CAGR and margins for every line item
+    and every period of a yfinance statement in one pass.
+
+    `financials` is a yfinance-style frame: line items as rows, period end
+    dates as columns (newest first). Returns a dict of frames ordered oldest
+    to newest; missing or undefined values are NaN.
+    """
+    frame = financials.sort_index(axis=1)
+    frame = frame.loc[~frame.index.duplicated()]
+    values = frame.to_numpy(dtype=float)
+    periods = pd.to_datetime(frame.columns)
+
+    # Period-over-period % change, undefined where the base is 0 or missing
+    change = np.full_like(values, np.nan)
+    prev = values[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change[:, 1:] = np.where(prev != 0, (values[:, 1:] - prev) / np.abs(prev) * 100, np.nan)
+
+    # CAGR between the first and last period, for positive endpoints only
+    cagr = np.full(len(values), np.nan)
+    if len(periods) >= 2:
+        years = (periods[-1] - periods[0]).days / 365.25
+        first, last = values[:, 0], values[:, -1]
+        valid = (first > 0) & (last > 0) & (years > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr[valid] = ((last[valid] / first[valid]) ** (1 / years) - 1) * 100
+
+    # Margins: each line item over revenue, broadcast across all periods
+    margins = pd.DataFrame(np.nan, index=list(MARGINS.values()), columns=periods)
+    if 'Total Revenue' in frame.index:
+        revenue = values[frame.index.get_loc('Total Revenue')]
+        rows = [field for field in MARGINS if field in frame.index]
+        if rows:
+            positions = [frame.index.get_loc(field) for field in rows]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(revenue != 0, values[positions] / revenue * 100, np.nan)
+            margins.loc[[MARGINS[field] for field in rows]] = ratio
+
+    return {
+        "periods": periods,
+        "values": pd.DataFrame(values, index=frame.index, columns=periods),
+        "change": pd.DataFrame(change, index=frame.index, columns=periods),
+        "cagr": pd.Series(cagr, index=frame.index),
+        "margins": margins
+    }
+
+
+def generate_insight(metric, current, change_pct):
+    """Generates a detailed, human-readable insight for a precomputed metric change."""
+    if np.isnan(change_pct):
+        return f"{metric} is ${current:,.0f}."
+
+    direction = "increased" if change_pct > 0 else "decreased"
+    magnitude = abs(change_pct)
+
+    insight = f"{metric} {direction} by {magnitude:.1f}% year-over-year."
+
+    # Contextual Analysis
+    if metric in ("Total Revenue", "Revenue"):
+        if magnitude > 15:
+            insight += " This strong growth indicates successful market expansion or high demand."
+        elif magnitude < 2:
+            insight += " This suggests top-line stagnation."
+        elif direction == "decreased":
+            insight += " A decline in revenue is a warning sign of shrinking market share or demand."
+
+    elif metric == "Net Income":
+        if direction == "increased" and magnitude > 20:
+            insight += " Profitability has improved significantly, showing better cost management or scalability."
+        elif direction == "decreased":
+            insight += " Falling profits despite revenue trends may indicate rising costs or one-time expenses."
+
+    elif metric == "Operating Income":
+        if direction == "increased":
+            insight += " Core business operations are becoming more efficient."
+        else:
+            insight += " Operational efficiency has declined."
+
+    return insight
+
+
+def summarize_latest(analysis):
+    """Builds the `financial_analysis` cards for the latest period from precomputed arrays."""
+    values, change, margins = analysis["values"], analysis["change"], analysis["margins"]
+    if len(analysis["periods"]) < 2:
+        return []
+
+    cards = []
+    for field, label in KEY_METRICS:
+        if field not in values.index:
+            continue
+        current = values.at[field, values.columns[-1]]
+        if np.isnan(current):
+            continue
+
+        margin_str = ""
+        if field in ('Net Income', 'Gross Profit'):
+            margin = margins.at[MARGINS[field], margins.columns[-1]]
+            if not np.isnan(margin):
+                margin_str = f" ({MARGINS[field]}: {margin:.1f}%)"
+
+        cards.append({
+            "metric": label,
+            "value": f"${current:,.0f}",
+            "change_reason": generate_insight(label, current, change.at[field, change.columns[-1]]) + margin_str
+        })
+    return cards
+
+
+def _json_values(array):
+    """NaN-safe conversion of a float array to a JSON-ready list."""
+    array = np.asarray(array, dtype=float)
+    return np.where(np.isfinite(array), np.round(array, 4), None).tolist()
+
+
+def series_payload(analysis):
+    """Full multi-period series for the key metrics, oldest period first."""
+    values, change, margins, cagr = analysis["values"], analysis["change"], analysis["margins"], analysis["cagr"]
+    metrics = {}
+    for field, label in KEY_METRICS:
+        if field not in values.index:
+            continue
+        metrics[label] = {
+            "values": _json_values(values.loc[field]),
+            "change": _json_values(change.loc[field]),
+            "cagr": _json_values([cagr[field]])[0]
+        }
+
+    return {
+        "periods": [period.strftime('%Y-%m-%d') for period in analysis["periods"]],
+        "metrics": metrics,
+        "margins": {label: _json_values(row) for label, row in margins.iterrows()}
+    }
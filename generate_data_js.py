@@ -1,6 +1,47 @@
+import os
+import sys
 import json
+import hashlib
 
-def generate_data_js():
+SHARD_DIR = 'slide_deck/data'
+PRICE_DECIMALS = 2
+
+def columnar_history(rows, decimals=PRICE_DECIMALS):
+    """priceHistory as one array per field, prices rounded to fixed precision."""
+    columns = {}
+    for row in rows:
+        for field, value in row.items():
+            columns.setdefault(field, []).append(round(value, decimals) if isinstance(value, float) else value)
+    return columns
+
+def minify(data):
+    return json.dumps(data, separators=(',', ':'))
+
+def write_shards(data, shard_dir=SHARD_DIR):
+    """
+    Writes one minified, content-hashed JSON shard per ticker and returns
+    the {ticker: filename} manifest. Shards from earlier builds are removed.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = {}
+    for ticker, entry in data.items():
+        entry = dict(entry, priceHistory=columnar_history(entry.get('priceHistory', [])))
+        body = minify(entry)
+        name = f"{ticker}.{hashlib.sha256(body.encode()).hexdigest()[:10]}.json"
+        with open(os.path.join(shard_dir, name), 'w') as f:
+            f.write(body)
+        manifest[ticker] = name
+
+    current = set(manifest.values())
+    for name in os.listdir(shard_dir):
+        if name.endswith('.json') and name != 'manifest.json' and name not in current:
+            os.remove(os.path.join(shard_dir, name))
+
+    with open(os.path.join(shard_dir, 'manifest.json'), 'w') as f:
+        f.write(minify(manifest))
+    return manifest
+
+def generate_data_js(sharded=False):
     # Load quantitative data
     try:
         with open('market_data.json', 'r') as f:
@@ -9,6 +50,15 @@ def generate_data_js():
         print("Error: market_data.json not found. Run fetch_market_data.py first.")
         return
 
+    # Price history from the columnar store, read one ticker slice at a time
+    from price_store import get_price_store
+    store = get_price_store()
+    if store is not None:
+        for ticker, entry in data.items():
+            bars = store.rows(ticker, last=len(entry.get('priceHistory') or []) or None)
+            if bars:
+                entry['priceHistory'] = bars
+
     # Qualitative Data (Synthesized from research)
     # Added Financial Analysis and Peer Context
     qualitative_insights = {
@@ -103,15 +153,26 @@ def generate_data_js():
     }
 
     # Merge data
-    from fetch_llm_data import fetch_llm_data
+    from fetch_llm_data import fetch_llm_data_many
+
+    # 1. Fetch live data from the LLM for every ticker at once
+    tickers = [ticker for ticker in qualitative_insights if ticker in data]
+    print(f"Attempting to fetch live data for {', '.join(tickers)}...")
+    llm_results = fetch_llm_data_many(tickers)
+
+    # Peer and sector aggregates over every cached snapshot, in one pass
+    from peer_aggregates import compute_aggregates, load_snapshots
+    try:
+        aggregates = compute_aggregates(load_snapshots(fallback={t: entry.get('ratios', {}) for t, entry in data.items()}))
+    except Exception as e:
+        print(f"Could not compute peer aggregates: {e}")
+        aggregates = None
 
     for ticker, insights in qualitative_insights.items():
         if ticker in data:
             data[ticker]['qualitative'] = insights
             
-            # 1. Try fetching Live Data from LLM
-            print(f"Attempting to fetch live data for {ticker}...")
-            llm_data = fetch_llm_data(ticker)
+            llm_data = llm_results.get(ticker)
             
             if llm_data and 'price' in llm_data:
                 print(f"Success! Updated {ticker} with live data: ${llm_data['price']}")
@@ -132,14 +193,30 @@ def generate_data_js():
                 if data[ticker]['priceHistory']:
                     data[ticker]['priceHistory'][-1]['close'] = price_overrides[ticker]
             
-            # Add Industry Averages (Mock data for now, ideally fetched)
-            data[ticker]['industry'] = {
+            # Industry averages: the previous block (or the mock defaults) unless peer medians exist
+            industry = data[ticker].get('industry') or {
                 "pe": 25.0 if ticker != 'NVDA' else 40.0,
                 "margins": 0.15 if ticker != 'NVDA' else 0.50
             }
+            # Peer-group medians plus the full peer/sector context
+            if aggregates is not None:
+                context = aggregates.summary(ticker)
+                peer_stats = (context['peerGroup'] or {}).get('stats', {})
+                medians = {
+                    "pe": peer_stats.get('pe', {}).get('median'),
+                    "margins": peer_stats.get('netMargin', {}).get('median')
+                }
+                industry = {**industry, **{key: value for key, value in medians.items() if value is not None}}
+                data[ticker]['peers'] = context
+            data[ticker]['industry'] = industry
 
-    # Write to data.js
-    js_content = f"const marketData = {json.dumps(data, indent=4)};"
+    # Write to data.js; in sharded mode it only carries the manifest and the deck fetches shards on demand
+    if sharded:
+        manifest = write_shards(data)
+        js_content = f"const marketData = {{}};\nconst MARKET_DATA_MANIFEST = {minify(manifest)};"
+        print(f"Wrote {len(manifest)} shards to {SHARD_DIR}")
+    else:
+        js_content = f"const marketData = {json.dumps(data, indent=4)};"
     
     with open('slide_deck/data.js', 'w') as f:
         f.write(js_content)
@@ -147,4 +224,4 @@ def generate_data_js():
     print("Successfully generated slide_deck/data.js")
 
 if __name__ == "__main__":
-    generate_data_js()
+    generate_data_js(sharded='--sharded' in sys.argv)
@@ -0,0 +1,224 @@
+"""
+Technical indicators shared by server.py and the market_data.json pipeline.
+
+Batch functions are vectorized over a whole close-price history.
+IndicatorState carries the same indicators forward one bar at a time in
+O(1), so appending a bar never recomputes a window.
+"""
+from collections import deque
+import numpy as np
+import pandas as pd
+
+SMA_WINDOWS = (50, 200)
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_STD = 20, 2.0
+
+
+def sma(closes, window):
+    """Simple moving average; NaN until the window is full."""
+    closes = np.asarray(closes, dtype=float)
+    out = np.full(len(closes), np.nan)
+    if len(closes) >= window:
+        csum = np.cumsum(np.insert(closes, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def ema(closes, span):
+    """Exponential moving average seeded with the first close (no bias adjustment)."""
+    return pd.Series(np.asarray(closes, dtype=float)).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def rsi(closes, period=RSI_PERIOD):
+    """RSI over simple rolling means of gains and losses; NaN until `period` changes exist."""
+    delta = np.diff(np.asarray(closes, dtype=float))
+    gains = sma(np.clip(delta, 0, None), period)
+    losses = sma(np.clip(-delta, 0, None), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+    values[np.isnan(gains)] = np.nan
+    return np.concatenate(([np.nan], values))
+
+
+def macd(closes, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """MACD line and its signal line."""
+    line = ema(closes, fast) - ema(closes, slow)
+    return line, ema(line, signal)
+
+
+def bollinger(closes, window=BB_WINDOW, num_std=BB_STD):
+    """Upper and lower Bollinger bands (sample std over the window)."""
+    closes = np.asarray(closes, dtype=float)
+    mid = sma(closes, window)
+    sq_mean = sma(closes * closes, window)
+    variance = (sq_mean - mid * mid) * window / (window - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    return mid + num_std * std, mid - num_std * std
+
+
+def _latest(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def compute_indicators(closes):
+    """Latest indicator values for a close history, in market_data.json field names."""
+    closes = np.asarray(closes, dtype=float)
+    if len(closes) == 0:
+        return {"sma50": None, "sma200": None, "rsi": None, "macd": None,
+                "macdSignal": None, "bbUpper": None, "bbLower": None}
+
+    macd_line, macd_signal = macd(closes)
+    bb_upper, bb_lower = bollinger(closes)
+    return {
+        "sma50": _latest(sma(closes, 50)[-1]),
+        "sma200": _latest(sma(closes, 200)[-1]),
+        "rsi": _latest(rsi(closes)[-1]),
+        "macd": _latest(macd_line[-1]),
+        "macdSignal": _latest(macd_signal[-1]),
+        "bbUpper": _latest(bb_upper[-1]),
+        "bbLower": _latest(bb_lower[-1])
+    }
+
+
+def signal_label(indicators):
+    """One-word read of RSI and MACD for display."""
+    rsi_value, macd_value, signal_value = indicators.get("rsi"), indicators.get("macd"), indicators.get("macdSignal")
+    if rsi_value is not None and rsi_value > 70:
+        return "Overbought"
+    if rsi_value is not None and rsi_value < 30:
+        return "Oversold"
+    if macd_value is None or signal_value is None:
+        return "Neutral"
+    return "Bullish" if macd_value > signal_value else "Bearish"
+
+
+class _RollingWindow:
+    """Fixed-size window with running sum and sum of squares."""
+
+    def __init__(self, size, values=()):
+        self.size = size
+        self.values = deque(values, maxlen=size)
+        self.total = float(sum(self.values))
+        self.total_sq = float(sum(v * v for v in self.values))
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else None
+
+    def std(self):
+        """Sample standard deviation of a full window."""
+        if not self.full:
+            return None
+        variance = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+
+class IndicatorState:
+    """
+    Incremental indicator engine. Seed it from a history once with
+    `from_history`, then call `update(close)` per new bar in O(1).
+    """
+
+    def __init__(self):
+        self.windows = {w: _RollingWindow(w) for w in SMA_WINDOWS + (BB_WINDOW,)}
+        self.gains = _RollingWindow(RSI_PERIOD)
+        self.losses = _RollingWindow(RSI_PERIOD)
+        self.ema_fast = self.ema_slow = self.macd_signal = None
+        self.last_close = None
+
+    @classmethod
+    def from_history(cls, closes):
+        """Seeds the state from a full history using the vectorized functions."""
+        closes = np.asarray(closes, dtype=float)
+        state = cls()
+        if len(closes) == 0:
+            return state
+
+        for size in state.windows:
+            state.windows[size] = _RollingWindow(size, closes[-size:].tolist())
+        state.ema_fast = float(ema(closes, MACD_FAST)[-1])
+        state.ema_slow = float(ema(closes, MACD_SLOW)[-1])
+        state.macd_signal = float(macd(closes)[1][-1])
+        delta = np.diff(closes[-(RSI_PERIOD + 1):])
+        state.gains = _RollingWindow(RSI_PERIOD, np.clip(delta, 0, None).tolist())
+        state.losses = _RollingWindow(RSI_PERIOD, np.clip(-delta, 0, None).tolist())
+        state.last_close = float(closes[-1])
+        return state
+
+    def update(self, close):
+        """Appends one bar and returns the latest indicators."""
+        close = float(close)
+        for window in self.windows.values():
+            window.push(close)
+
+        if self.last_close is None:
+            self.ema_fast = self.ema_slow = close
+            self.macd_signal = 0.0
+        else:
+            self.ema_fast += (close - self.ema_fast) * 2 / (MACD_FAST + 1)
+            self.ema_slow += (close - self.ema_slow) * 2 / (MACD_SLOW + 1)
+            self.macd_signal += ((self.ema_fast - self.ema_slow) - self.macd_signal) * 2 / (MACD_SIGNAL + 1)
+
+            change = close - self.last_close
+            self.gains.push(max(change, 0.0))
+            self.losses.push(max(-change, 0.0))
+        self.last_close = close
+        return self.indicators()
+
+    def indicators(self):
+        """Latest indicator values, in market_data.json field names."""
+        rsi_value = None
+        if self.gains.full:
+            avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+            rsi_value = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+        bb = self.windows[BB_WINDOW]
+        mid, std = bb.mean(), bb.std()
+        return {
+            "sma50": self.windows[50].mean(),
+            "sma200": self.windows[200].mean(),
+            "rsi": rsi_value,
+            "macd": None if self.ema_fast is None else self.ema_fast - self.ema_slow,
+            "macdSignal": self.macd_signal,
+            "bbUpper": None if mid is None else mid + BB_STD * std,
+            "bbLower": None if mid is None else mid - BB_STD * std
+        }
+
+    def to_dict(self):
+        """JSON-serializable snapshot, for resuming updates in a later run."""
+        return {
+            "windows": {str(size): list(window.values) for size, window in self.windows.items()},
+            "emaFast": self.ema_fast,
+            "emaSlow": self.ema_slow,
+            "macdSignal": self.macd_signal,
+            "gains": list(self.gains.values),
+            "losses": list(self.losses.values),
+            "lastClose": self.last_close
+        }
+
+    @classmethod
+    def from_dict(cls, snapshot):
+        state = cls()
+        for size, values in snapshot["windows"].items():
+            state.windows[int(size)] = _RollingWindow(int(size), values)
+        state.ema_fast = snapshot["emaFast"]
+        state.ema_slow = snapshot["emaSlow"]
+        state.macd_signal = snapshot["macdSignal"]
+        state.gains = _RollingWindow(RSI_PERIOD, snapshot["gains"])
+        state.losses = _RollingWindow(RSI_PERIOD, snapshot["losses"])
+        state.last_close = snapshot["lastClose"]
+        return state
@@ -0,0 +1,116 @@
+"""
+Content-addressed on-disk cache for LLM enrichment responses.
+
+Entries are keyed by (ticker, prompt hash, model, date bucket) and stored
+as one JSON file per key, named by the key's sha256, holding the parsed
+and validated response rather than the raw completion text. Entries expire
+after LLM_CACHE_TTL, and the least recently used files are evicted beyond
+LLM_CACHE_MAX_ENTRIES.
+
+LLM_CACHE_ONLY=1 never calls the API: each ticker gets its newest cached
+entry for the same prompt and model, whatever its age, so offline builds
+are instant and reproducible.
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_cache')
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(6 * 60 * 60)))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+LLM_CACHE_ONLY = os.getenv("LLM_CACHE_ONLY", "0") == "1"
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "on") != "off"
+
+
+def prompt_hash(payload):
+    """Stable hash of the request's messages (model excluded; it is a separate key part)."""
+    messages = json.dumps(payload.get("messages", []), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(messages.encode()).hexdigest()[:16]
+
+
+def date_bucket(now=None):
+    """UTC date, so answers about "current" prices are never reused across days."""
+    now = time.time() if now is None else now
+    return datetime.datetime.fromtimestamp(now, datetime.timezone.utc).date().isoformat()
+
+
+class LLMCache:
+    """(ticker, prompt hash, model, date bucket) -> parsed JSON, one file per key."""
+
+    def __init__(self, path=LLM_CACHE_DIR, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, ticker, prompt, model, bucket):
+        key = json.dumps([ticker.upper(), prompt, model, bucket], separators=(',', ':'))
+        return os.path.join(self.path, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, path):
+        # mtime is the LRU clock
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, ticker, prompt, model, bucket=None):
+        """Cached data for today's bucket if younger than the TTL, else None."""
+        path = self._file(ticker, prompt, model, bucket or date_bucket())
+        entry = self._read(path)
+        if entry is None or time.time() - entry["storedAt"] > self.ttl:
+            return None
+        self._touch(path)
+        return entry["data"]
+
+    def latest(self, ticker, prompt, model):
+        """Newest entry for (ticker, prompt, model) in any bucket, ignoring the TTL."""
+        best = None
+        for name in os.listdir(self.path):
+            entry = self._read(os.path.join(self.path, name))
+            if (entry is not None and entry["ticker"] == ticker.upper() and entry["prompt"] == prompt
+                    and entry["model"] == model and (best is None or entry["storedAt"] > best["storedAt"])):
+                best = entry
+        return None if best is None else best["data"]
+
+    def put(self, ticker, prompt, model, data, bucket=None):
+        bucket = bucket or date_bucket()
+        entry = {"ticker": ticker.upper(), "prompt": prompt, "model": model, "bucket": bucket,
+                 "storedAt": time.time(), "data": data}
+        path = self._file(ticker, prompt, model, bucket)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """Drops the least recently used entries beyond max_entries."""
+        with self._lock:
+            files = []
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    path = os.path.join(self.path, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass
+            files.sort()
+            for _, path in files[:max(0, len(files) - self.max_entries)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
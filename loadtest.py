@@ -0,0 +1,76 @@
+"""
+Closed-loop HTTP load generator for the research API.
+
+    python loadtest.py --url http://localhost:5000 --clients 200 --duration 30
+
+Each client issues requests back-to-back over the given tickers, so the
+dev server (server.py) and the async mode (async_server.py) can be
+compared under the same load.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+import aiohttp
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_client(session, base_url, tickers, deadline, latencies, statuses, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        ticker = tickers[i % len(tickers)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with session.get(f"{base_url}/api/research/{ticker}") as response:
+                await response.read()
+                statuses[response.status] += 1
+        except aiohttp.ClientError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(base_url, tickers, clients, duration):
+    latencies = []
+    statuses = Counter()
+    connector = aiohttp.TCPConnector(limit=clients)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(session, base_url, tickers, deadline, latencies, statuses, i)
+            for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the research API")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--tickers', default='TSLA,NVDA,AAPL,NKE')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=30.0)
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()]
+    print(f"Driving {args.url} with {args.clients} clients for {args.duration:.0f}s...")
+    latencies, statuses, elapsed = asyncio.run(run_load(args.url, tickers, args.clients, args.duration))
+
+    latencies.sort()
+    print(f"Requests:   {len(latencies)} in {elapsed:.1f}s ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"Latency:    p50 {percentile(latencies, 50) * 1000:.1f}ms"
+          f" | p95 {percentile(latencies, 95) * 1000:.1f}ms"
+          f" | p99 {percentile(latencies, 99) * 1000:.1f}ms")
+    print("Statuses:  ", ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Pluggable market-data providers.
+
+All yfinance access goes through a provider so the server and the fetch
+scripts can run against live data, record what they see to disk, or
+replay recorded fixtures with no network at all:
+
+    MARKET_DATA_PROVIDER=live     # default, calls yfinance
+    MARKET_DATA_PROVIDER=record   # live, and saves every response under MARKET_DATA_FIXTURES
+    MARKET_DATA_PROVIDER=replay   # serves MARKET_DATA_FIXTURES, sleeping MARKET_DATA_LATENCY_MS per call
+
+Live data is read through the persistent SQLite cache in market_store.py
+(MARKET_CACHE_DB; set MARKET_CACHE=off to bypass it).
+"""
+import json
+import os
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from market_store import DEFAULT_DB_PATH, MarketStore
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'market_data')
+
+
+class MarketDataProvider:
+    """Interface for ticker data. Frames use the yfinance layouts."""
+
+    def info(self, ticker):
+        """Quote and profile fields, as yfinance's Ticker.info dict."""
+        raise NotImplementedError
+
+    def financials(self, ticker):
+        """Annual income statement: line items as rows, period ends as columns."""
+        raise NotImplementedError
+
+    def quarterly_financials(self, ticker):
+        """Quarterly income statement, same layout as financials()."""
+        raise NotImplementedError
+
+    def balance_sheet(self, ticker):
+        """Annual balance sheet, same layout as financials()."""
+        raise NotImplementedError
+
+    def cashflow(self, ticker):
+        """Annual cash-flow statement, same layout as financials()."""
+        raise NotImplementedError
+
+    def history(self, ticker, period='1y'):
+        """Daily OHLCV bars indexed by date."""
+        raise NotImplementedError
+
+    def prices(self, tickers):
+        """Latest close per ticker ({ticker: price}); providers may batch this."""
+        prices = {}
+        for ticker in tickers:
+            bars = self.history(ticker, period='5d')
+            if not bars.empty:
+                prices[ticker] = float(bars['Close'].iloc[-1])
+        return prices
+
+
+class LiveProvider(MarketDataProvider):
+    """Fetches straight from Yahoo Finance."""
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    def financials(self, ticker):
+        return yf.Ticker(ticker).financials
+
+    def quarterly_financials(self, ticker):
+        return yf.Ticker(ticker).quarterly_financials
+
+    def balance_sheet(self, ticker):
+        return yf.Ticker(ticker).balance_sheet
+
+    def cashflow(self, ticker):
+        return yf.Ticker(ticker).cashflow
+
+    def history(self, ticker, period='1y'):
+        return yf.Ticker(ticker).history(period=period)
+
+    def prices(self, tickers):
+        """One bulk download for every ticker."""
+        if not tickers:
+            return {}
+        bars = yf.download(list(tickers), period='5d', group_by='ticker', progress=False, threads=True)
+        prices = {}
+        for ticker in tickers:
+            if ticker not in bars.columns.get_level_values(0):
+                continue
+            closes = bars[ticker]['Close'].dropna()
+            if not closes.empty:
+                prices[ticker] = float(closes.iloc[-1])
+        return prices
+
+
+# --- Fixture encoding ---
+
+def _encode_axis(axis):
+    if isinstance(axis, pd.DatetimeIndex):
+        tz = str(axis.tz) if axis.tz is not None else None
+        naive = axis.tz_localize(None) if tz else axis
+        return {"dates": [d.isoformat() for d in naive], "tz": tz}
+    return {"labels": [str(label) for label in axis]}
+
+
+def _decode_axis(spec):
+    if "dates" in spec:
+        axis = pd.DatetimeIndex(pd.to_datetime(spec["dates"]))
+        return axis.tz_localize(spec["tz"]) if spec["tz"] else axis
+    return pd.Index(spec["labels"])
+
+
+def frame_to_json(frame):
+    """JSON-ready dict for a numeric frame (NaN stored as null)."""
+    values = frame.to_numpy(dtype=float, na_value=np.nan)
+    return {
+        "index": _encode_axis(frame.index),
+        "columns": _encode_axis(frame.columns),
+        "data": np.where(np.isfinite(values), values, None).tolist()
+    }
+
+
+def frame_from_json(payload):
+    index = _decode_axis(payload["index"])
+    columns = _decode_axis(payload["columns"])
+    data = np.array(payload["data"], dtype=float).reshape(len(index), len(columns))
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def _fixture_path(root, ticker, dataset):
+    return os.path.join(root, ticker.upper(), f"{dataset}.json")
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and saves each response as a replayable fixture."""
+
+    def __init__(self, inner, fixtures_dir=DEFAULT_FIXTURES_DIR):
+        self.inner = inner
+        self.fixtures_dir = fixtures_dir
+
+    def _save(self, ticker, dataset, payload):
+        path = _fixture_path(self.fixtures_dir, ticker, dataset)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(payload, f, default=str)
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        self._save(ticker, 'info', info)
+        return info
+
+    def financials(self, ticker):
+        frame = self.inner.financials(ticker)
+        self._save(ticker, 'financials', frame_to_json(frame))
+        return frame
+
+    def quarterly_financials(self, ticker):
+        frame = self.inner.quarterly_financials(ticker)
+        self._save(ticker, 'quarterly_financials', frame_to_json(frame))
+        return frame
+
+    def balance_sheet(self, ticker):
+        frame = self.inner.balance_sheet(ticker)
+        self._save(ticker, 'balance_sheet', frame_to_json(frame))
+        return frame
+
+    def cashflow(self, ticker):
+        frame = self.inner.cashflow(ticker)
+        self._save(ticker, 'cashflow', frame_to_json(frame))
+        return frame
+
+    def history(self, ticker, period='1y'):
+        frame = self.inner.history(ticker, period=period)
+        self._save(ticker, f'history_{period}', frame_to_json(frame))
+        return frame
+
+    def prices(self, tickers):
+        prices = self.inner.prices(tickers)
+        for ticker, price in prices.items():
+            self._save(ticker, 'price', price)
+        return prices
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded fixtures, optionally sleeping to mimic upstream latency
+    (`latency` seconds, plus up to `jitter` seconds at random).
+    """
+
+    def __init__(self, fixtures_dir=DEFAULT_FIXTURES_DIR, latency=0.0, jitter=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _load(self, ticker, dataset):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+
+        key = (ticker.upper(), dataset)
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+
+        path = _fixture_path(self.fixtures_dir, ticker, dataset)
+        if not os.path.exists(path):
+            raise KeyError(f"No {dataset} fixture for {ticker} in {self.fixtures_dir}")
+        with open(path) as f:
+            payload = json.load(f)
+
+        with self._lock:
+            self._loaded[key] = payload
+        return payload
+
+    def info(self, ticker):
+        return self._load(ticker, 'info')
+
+    def financials(self, ticker):
+        return frame_from_json(self._load(ticker, 'financials'))
+
+    def quarterly_financials(self, ticker):
+        return frame_from_json(self._load(ticker, 'quarterly_financials'))
+
+    def balance_sheet(self, ticker):
+        return frame_from_json(self._load(ticker, 'balance_sheet'))
+
+    def cashflow(self, ticker):
+        return frame_from_json(self._load(ticker, 'cashflow'))
+
+    def history(self, ticker, period='1y'):
+        return frame_from_json(self._load(ticker, f'history_{period}'))
+
+    def prices(self, tickers):
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = self._load(ticker, 'price')
+            except KeyError:
+                pass
+        return prices
+
+
+class CachedProvider(MarketDataProvider):
+    """Serves from a MarketStore while fresh, falling back to (and filling from) another provider."""
+
+    def __init__(self, inner, store):
+        self.inner = inner
+        self.store = store
+
+    def _cached(self, ticker, dataset, fetch, encode, decode):
+        payload = self.store.get(ticker, dataset)
+        if payload is not None:
+            return decode(payload)
+        value = fetch()
+        self.store.put(ticker, dataset, encode(value))
+        return value
+
+    def info(self, ticker):
+        return self._cached(ticker, 'info', lambda: self.inner.info(ticker), dict, dict)
+
+    def financials(self, ticker):
+        return self._cached(ticker, 'financials', lambda: self.inner.financials(ticker),
+                            frame_to_json, frame_from_json)
+
+    def quarterly_financials(self, ticker):
+        return self._cached(ticker, 'quarterly_financials', lambda: self.inner.quarterly_financials(ticker),
+                            frame_to_json, frame_from_json)
+
+    def balance_sheet(self, ticker):
+        return self._cached(ticker, 'balance_sheet', lambda: self.inner.balance_sheet(ticker),
+                            frame_to_json, frame_from_json)
+
+    def cashflow(self, ticker):
+        return self._cached(ticker, 'cashflow', lambda: self.inner.cashflow(ticker),
+                            frame_to_json, frame_from_json)
+
+    def history(self, ticker, period='1y'):
+        return self._cached(ticker, f'history_{period}', lambda: self.inner.history(ticker, period=period),
+                            frame_to_json, frame_from_json)
+
+    def prices(self, tickers):
+        """Fresh cached prices, plus one bulk fetch for the rest."""
+        prices = {}
+        missing = []
+        for ticker in tickers:
+            price = self.store.get(ticker, 'price')
+            if price is None:
+                missing.append(ticker)
+            else:
+                prices[ticker] = price
+
+        fetched = self.inner.prices(missing) if missing else {}
+        for ticker, price in fetched.items():
+            self.store.put(ticker, 'price', price)
+        prices.update(fetched)
+        return prices
+
+
+# --- Process-wide provider ---
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def provider_from_env():
+    mode = os.getenv("MARKET_DATA_PROVIDER", "live").lower()
+    fixtures_dir = os.getenv("MARKET_DATA_FIXTURES", DEFAULT_FIXTURES_DIR)
+
+    if mode == "live":
+        if os.getenv("MARKET_CACHE", "on").lower() == "off":
+            return LiveProvider()
+        return CachedProvider(LiveProvider(), MarketStore(os.getenv("MARKET_CACHE_DB", DEFAULT_DB_PATH)))
+    if mode == "record":
+        return RecordingProvider(LiveProvider(), fixtures_dir)
+    if mode == "replay":
+        latency = float(os.getenv("MARKET_DATA_LATENCY_MS", "0")) / 1000
+        jitter = float(os.getenv("MARKET_DATA_JITTER_MS", "0")) / 1000
+        return ReplayProvider(fixtures_dir, latency=latency, jitter=jitter)
+    raise ValueError(f"Unknown MARKET_DATA_PROVIDER '{mode}' (expected live, record or replay)")
+
+
+def get_provider():
+    """The provider every entry point should use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_env()
+        return _provider
+
+
+def set_provider(provider):
+    """Swaps the process-wide provider (benchmarks, offline runs)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,100 @@
+"""
+Persistent on-disk cache for market data, shared by the server and the
+fetch scripts.
+
+Rows are keyed by (ticker, dataset, as_of) where as_of is the UTC date of
+the fetch, so a day's snapshot survives restarts and older days stay
+available until pruned. Freshness is decided per dataset by DATASET_TTLS.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'market_cache.sqlite')
+
+# Seconds a cached dataset stays fresh
+DATASET_TTLS = {
+    "price": 15 * 60,
+    "info": 15 * 60,
+    "history": 6 * 60 * 60,
+    "quarterly_financials": 24 * 60 * 60,
+    "financials": 7 * 24 * 60 * 60,
+    "balance_sheet": 7 * 24 * 60 * 60,
+    "cashflow": 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# Snapshots older than this are deleted when the store is opened
+RETENTION_DAYS = 30
+
+
+def ttl_for(dataset):
+    """TTL for a dataset name; parameterized names like history_1y use their prefix."""
+    if dataset in DATASET_TTLS:
+        return DATASET_TTLS[dataset]
+    return DATASET_TTLS.get(dataset.split('_')[0], DEFAULT_TTL)
+
+
+class MarketStore:
+    """SQLite-backed (ticker, dataset, as_of) -> JSON payload store, safe across threads and processes."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS market_data (
+                    ticker TEXT NOT NULL,
+                    dataset TEXT NOT NULL,
+                    as_of TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (ticker, dataset, as_of)
+                )
+            """)
+        self.prune(RETENTION_DAYS)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, ticker, dataset, max_age=None):
+        """Latest payload for (ticker, dataset) if younger than max_age (default: dataset TTL)."""
+        max_age = ttl_for(dataset) if max_age is None else max_age
+        row = self._connect().execute(
+            "SELECT payload, fetched_at FROM market_data WHERE ticker = ? AND dataset = ? ORDER BY as_of DESC LIMIT 1",
+            (ticker.upper(), dataset),
+        ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return json.loads(row[0])
+
+    def latest(self, dataset):
+        """{ticker: newest payload} for every ticker holding `dataset`, whatever its age."""
+        rows = self._connect().execute(
+            """SELECT ticker, payload FROM market_data WHERE dataset = ? AND (ticker, as_of) IN
+               (SELECT ticker, MAX(as_of) FROM market_data WHERE dataset = ? GROUP BY ticker)""",
+            (dataset, dataset),
+        ).fetchall()
+        return {ticker: json.loads(payload) for ticker, payload in rows}
+
+    def put(self, ticker, dataset, payload, as_of=None):
+        as_of = as_of or datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO market_data (ticker, dataset, as_of, fetched_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (ticker.upper(), dataset, as_of, time.time(), json.dumps(payload, default=str)),
+            )
+
+    def prune(self, older_than_days):
+        cutoff = (datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=older_than_days)).isoformat()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM market_data WHERE as_of < ?", (cutoff,))
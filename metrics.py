@@ -0,0 +1,108 @@
+"""
+Prometheus metrics for the research API, exposed on /metrics by both
+server.py and async_server.py.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics says so, but both servers still run.
+"""
+from contextlib import nullcontext
+from stage_timing import add_stage_observer
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+except ImportError:
+    CONTENT_TYPE_LATEST = "text/plain; charset=utf-8"
+    generate_latest = None
+
+    class _NoOpMetric:
+        """Accepts the calls the servers make on a Counter, Gauge or Histogram, and records nothing."""
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *values):
+            return self
+
+        def inc(self, amount=1):
+            pass
+
+        def set(self, value):
+            pass
+
+        def set_function(self, function):
+            pass
+
+        def observe(self, value):
+            pass
+
+        def time(self):
+            return nullcontext()
+
+        def track_inprogress(self):
+            return nullcontext()
+
+    Counter = Gauge = Histogram = _NoOpMetric
+
+# Stages that call the market-data provider
+UPSTREAM_STAGES = ("info", "financials", "history")
+
+STAGE_SECONDS = Histogram(
+    "research_stage_seconds",
+    "Time spent in each stage of building a research payload.",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_SECONDS = Histogram(
+    "research_request_seconds",
+    "End-to-end latency of research API requests.",
+    ["endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+CACHE_LOOKUPS = Counter(
+    "research_cache_lookups_total",
+    "Research cache lookups by outcome (hit, stale, miss, coalesced).",
+    ["outcome"],
+)
+UPSTREAM_ERRORS = Counter(
+    "research_upstream_errors_total",
+    "Failed market-data provider calls, by stage.",
+    ["stage"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "research_requests_in_flight",
+    "Research API requests currently being served.",
+    ["endpoint"],
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "research_upstream_fetches_in_flight",
+    "Research payloads currently being fetched from the provider.",
+)
+PREFETCH_REFRESHES = Counter(
+    "research_prefetch_refreshes_total",
+    "Background prefetch refreshes by outcome (ok, error).",
+    ["outcome"],
+)
+QUEUE_DEPTH = Gauge(
+    "research_queue_depth",
+    "Requests waiting on an upstream fetch (async mode).",
+)
+
+
+def record_cache_lookup(outcome):
+    CACHE_LOOKUPS.labels(outcome).inc()
+
+
+def _observe_stage(stage, seconds, failed):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    if failed and stage in UPSTREAM_STAGES:
+        UPSTREAM_ERRORS.labels(stage).inc()
+
+
+add_stage_observer(_observe_stage)
+
+
+def render_metrics():
+    """(body, content_type) for a /metrics response."""
+    if generate_latest is None:
+        return b"# metrics disabled: pip install prometheus_client\n", CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,121 @@
+"""
+Serialized, precompressed research responses.
+
+A payload is encoded once when it enters the research cache: JSON bytes,
+gzip and (if the brotli package is installed) brotli variants, and strong
+ETags derived from the content hash, one per content-coding. Identical
+content reuses the already-compressed variants, so an unchanged background
+refresh costs one hash instead of a full compression pass.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Encoded payloads remembered by content hash
+MAX_REMEMBERED = 512
+
+# ETag suffix per content-coding: strong validators must differ between representations
+ETAG_SUFFIXES = {None: '', 'gzip': '-gz', 'br': '-br'}
+
+
+def accepted_codings(accept_encoding):
+    """{coding: q} from an Accept-Encoding header; a malformed q counts as 1."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def dumps(data):
+    """JSON-encodes to bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+class EncodedPayload:
+    """JSON body plus compressed variants, each with its own strong ETag."""
+
+    __slots__ = ('body', 'gzip', 'br', 'etag')
+
+    def __init__(self, body, digest):
+        self.body = body
+        self.etag = f'"{digest[:32]}"'  # identity representation
+        self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+        self.br = brotli.compress(body, quality=11) if brotli is not None else None
+
+    def etag_for(self, encoding):
+        """Strong ETag of the representation sent with `encoding` (None for identity)."""
+        return f'{self.etag[:-1]}{ETAG_SUFFIXES[encoding]}"'
+
+    def negotiate(self, accept_encoding):
+        """
+        Best (body, content_encoding) for an Accept-Encoding header;
+        encoding is None for identity. Codings refused with q=0 are never
+        chosen. Among the rest the highest q wins (brotli first on ties),
+        unless the client explicitly ranks identity higher.
+        """
+        accepted = accepted_codings(accept_encoding)
+        default = accepted.get('*', 0.0)
+        candidates = [(self.br, 'br'), (self.gzip, 'gzip')] if self.br is not None else [(self.gzip, 'gzip')]
+        best, best_q = (self.body, None), accepted.get('identity', 0.0)
+        for body, coding in candidates:
+            q = accepted.get(coding, default)
+            if q > 0 and q >= best_q and (best[1] is None or q > best_q):
+                best, best_q = (body, coding), q
+        return best
+
+    def matches(self, if_none_match):
+        """True when an If-None-Match header covers any of this payload's representations."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return any(self.etag_for(coding) in tags for coding in ETAG_SUFFIXES)
+
+
+_remembered = OrderedDict()
+_remembered_lock = threading.Lock()
+
+
+def encode_payload(data):
+    """Serializes data and returns its EncodedPayload, reusing one with identical content."""
+    body = dumps(data)
+    digest = hashlib.sha256(body).hexdigest()
+
+    with _remembered_lock:
+        payload = _remembered.get(digest)
+        if payload is not None:
+            _remembered.move_to_end(digest)
+            return payload
+
+    payload = EncodedPayload(body, digest)
+    with _remembered_lock:
+        _remembered[digest] = payload
+        while len(_remembered) > MAX_REMEMBERED:
+            _remembered.popitem(last=False)
+    return payload
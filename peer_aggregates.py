@@ -0,0 +1,151 @@
+"""
+Peer-group and sector aggregates for valuation and profitability ratios.
+
+Snapshots are the newest cached `info` payloads in the market-data store
+(falling back to market_data.json ratios for tickers the store has not
+seen). Peer groups come from fetch_market_data.TICKERS: each main ticker
+plus its peers. All statistics and percentile ranks are computed with
+grouped pandas operations over the whole universe at once.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+# Output name -> yfinance info field
+METRICS = {
+    "pe": "trailingPE",
+    "ps": "priceToSalesTrailing12Months",
+    "grossMargin": "grossMargins",
+    "operatingMargin": "operatingMargins",
+    "netMargin": "profitMargins",
+    "beta": "beta",
+}
+STATS = ("median", "mean", "p25", "p75")
+
+
+def load_snapshots(store=None, fallback=None):
+    """
+    One row per ticker: METRICS columns plus sector. `store` is a
+    MarketStore (default: the shared cache); `fallback` maps tickers to
+    info-like dicts used when the store has no snapshot.
+    """
+    if store is None:
+        from market_store import DEFAULT_DB_PATH, MarketStore
+        store = MarketStore(os.getenv("MARKET_CACHE_DB", DEFAULT_DB_PATH))
+    snapshots = dict(fallback or {})
+    snapshots.update(store.latest('info'))
+    return snapshots_frame(snapshots)
+
+
+def snapshots_frame(snapshots):
+    """{ticker: info dict} -> numeric frame indexed by ticker."""
+    frame = pd.DataFrame.from_dict(
+        {ticker.upper(): {name: info.get(field) for name, field in METRICS.items()} | {"sector": info.get("sector")}
+         for ticker, info in snapshots.items()},
+        orient='index',
+    )
+    if frame.empty:
+        frame = pd.DataFrame(columns=[*METRICS, "sector"])
+    metrics = frame[list(METRICS)].apply(pd.to_numeric, errors='coerce')
+    # A negative P/E or P/S is not a meaningful multiple
+    metrics[["pe", "ps"]] = metrics[["pe", "ps"]].where(metrics[["pe", "ps"]] > 0)
+    return metrics.assign(sector=frame["sector"]).rename_axis("ticker")
+
+
+def peer_memberships(tickers=None):
+    """(group, ticker) rows: each main ticker's group holds itself and its peers."""
+    if tickers is None:
+        from fetch_market_data import TICKERS as tickers
+    rows = [(main, symbol) for main, peers in tickers.items() for symbol in [main, *peers]]
+    return pd.DataFrame(rows, columns=["group", "ticker"])
+
+
+def _group_stats(values, key):
+    grouped = values.groupby(key)
+    quantiles = grouped.quantile([0.25, 0.75]).unstack()
+    stats = pd.concat({
+        "median": grouped.median(),
+        "mean": grouped.mean(),
+        "p25": quantiles.xs(0.25, axis=1, level=1),
+        "p75": quantiles.xs(0.75, axis=1, level=1),
+    }, axis=1)
+    return stats.assign(count=grouped.size())
+
+
+class PeerAggregates:
+    """Group statistics and per-ticker percentile ranks, computed once for the whole universe."""
+
+    def __init__(self, snapshots, memberships):
+        metrics = list(METRICS)
+
+        # Peer groups: a ticker appears once per group it belongs to
+        peers = memberships.join(snapshots[metrics], on="ticker")
+        self.peer_stats = _group_stats(peers[metrics], peers["group"])
+        self.peer_rank = peers.groupby("group")[metrics].rank(pct=True).set_axis(
+            pd.MultiIndex.from_frame(peers[["group", "ticker"]]))
+        self.members = memberships.groupby("group")["ticker"].agg(list)
+        self.first_group = memberships.drop_duplicates("ticker").set_index("ticker")["group"]
+
+        # Sectors: every ticker with a known sector
+        sectors = snapshots[snapshots["sector"].notna()]
+        self.sector_stats = _group_stats(sectors[metrics], sectors["sector"])
+        self.sector_rank = sectors[metrics].groupby(sectors["sector"]).rank(pct=True)
+        self.snapshots = snapshots
+
+        # Plain-dict views so per-ticker summaries are lookups, not frame indexing
+        self._peer_stats = self.peer_stats.to_dict('index')
+        self._peer_rank = self.peer_rank.to_dict('index')
+        self._sector_stats = self.sector_stats.to_dict('index')
+        self._sector_rank = self.sector_rank.to_dict('index')
+        self._sectors = snapshots["sector"].to_dict()
+        self._members = self.members.to_dict()
+        self._first_group = self.first_group.to_dict()
+
+    def group_of(self, ticker):
+        """The peer group a ticker leads, else the first one it belongs to."""
+        if ticker in self._members:
+            return ticker
+        return self._first_group.get(ticker)
+
+    def summary(self, ticker):
+        """JSON-ready peer and sector context for one ticker."""
+        ticker = ticker.upper()
+        result = {"peerGroup": None, "sector": None}
+
+        group = self.group_of(ticker)
+        if group is not None:
+            stats = self._peer_stats[group]
+            result["peerGroup"] = {
+                "name": group,
+                "tickers": self._members[group],
+                "count": int(stats[("count", "")]),
+                "stats": _stats_dict(stats),
+                "percentile": _clean(self._peer_rank[(group, ticker)]),
+            }
+
+        sector = self._sectors.get(ticker)
+        if isinstance(sector, str) and sector in self._sector_stats:
+            stats = self._sector_stats[sector]
+            result["sector"] = {
+                "name": sector,
+                "count": int(stats[("count", "")]),
+                "stats": _stats_dict(stats),
+                "percentile": _clean(self._sector_rank[ticker]),
+            }
+        return result
+
+
+def _clean(values):
+    return {key: (None if value is None or (isinstance(value, float) and np.isnan(value)) else float(value))
+            for key, value in values.items()}
+
+
+def _stats_dict(row):
+    return {metric: _clean({stat: row[(stat, metric)] for stat in STATS}) for metric in METRICS}
+
+
+def compute_aggregates(snapshots=None, memberships=None):
+    """PeerAggregates over the cached universe (or the given frames)."""
+    snapshots = load_snapshots() if snapshots is None else snapshots
+    memberships = peer_memberships() if memberships is None else memberships
+    return PeerAggregates(snapshots, memberships)
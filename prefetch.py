@@ -0,0 +1,105 @@
+"""
+Background prefetch scheduler that keeps the hot ticker set warm in the
+research cache.
+
+Every cycle (interval +/- jitter) it refreshes the hot set, most-requested
+tickers first, under a global rate limit; requested tickers outside the
+hot set only fill the slots the hot set leaves free. Request counts decay
+each cycle so priority follows recent traffic. The default hot set is
+every main ticker and peer in fetch_market_data.TICKERS.
+"""
+import os
+import random
+import threading
+from collections import Counter
+from fetch_market_data import TICKERS
+from rate_limit import TokenBucket
+from metrics import PREFETCH_REFRESHES
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "240"))  # seconds between cycles
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.2"))  # +/- fraction of the interval
+PREFETCH_RATE = float(os.getenv("PREFETCH_RATE", "1.0"))  # upstream refreshes per second
+PREFETCH_MAX_TICKERS = int(os.getenv("PREFETCH_MAX_TICKERS", "50"))
+
+
+def default_hot_set():
+    """PREFETCH_TICKERS if set, else every main ticker and peer we track."""
+    configured = os.getenv("PREFETCH_TICKERS")
+    if configured:
+        return [t.strip().upper() for t in configured.split(',') if t.strip()]
+
+    tickers = []
+    for ticker, peers in TICKERS.items():
+        for symbol in [ticker, *peers]:
+            if symbol not in tickers:
+                tickers.append(symbol)
+    return tickers
+
+
+class PrefetchScheduler:
+    """Refreshes hot tickers on an interval, ordered by observed request frequency."""
+
+    def __init__(self, refresh, hot_set=None, interval=PREFETCH_INTERVAL, jitter=PREFETCH_JITTER,
+                 rate=PREFETCH_RATE, max_tickers=PREFETCH_MAX_TICKERS):
+        self.refresh = refresh
+        self.hot_set = list(hot_set if hot_set is not None else default_hot_set())
+        self.interval = interval
+        self.jitter = jitter
+        self.max_tickers = max_tickers
+        self.bucket = TokenBucket(rate, capacity=1)
+
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record_request(self, ticker):
+        """Called by the request path once a ticker has resolved; raises its refresh priority."""
+        with self._lock:
+            self._counts[ticker] += 1
+
+    def ranked(self):
+        """
+        Tickers to refresh this cycle: the hot set, most requested first,
+        then other requested tickers in whatever slots remain.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        hot = sorted(dict.fromkeys(self.hot_set), key=lambda t: counts.get(t, 0), reverse=True)
+        members = set(hot)
+        extra = sorted((t for t in counts if t not in members), key=counts.get, reverse=True)
+        return (hot + extra)[:self.max_tickers]
+
+    def run_once(self):
+        for ticker in self.ranked():
+            if self._stop.is_set():
+                return
+            self.bucket.acquire()
+            try:
+                self.refresh(ticker)
+                PREFETCH_REFRESHES.labels('ok').inc()
+            except Exception as e:
+                PREFETCH_REFRESHES.labels('error').inc()
+                print(f"Prefetch failed for {ticker}: {e}")
+
+        # Halve counts so priority tracks recent traffic
+        with self._lock:
+            self._counts = Counter({t: c // 2 for t, c in self._counts.items() if c > 1})
+
+    def _next_delay(self):
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _loop(self):
+        self.run_once()
+        while not self._stop.wait(self._next_delay()):
+            self.run_once()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="research-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
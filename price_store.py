@@ -0,0 +1,249 @@
+"""
+Memory-mapped store for daily OHLCV history.
+
+Each ticker's bars live in their own .npy file, a record array with one
+field per column (date, open, high, low, close, volume), and index.json
+maps every ticker to its current file. Readers memory-map a ticker's file
+the first time it is read, so opening the store costs the index only and
+reading a ticker touches just that ticker's pages, however large the
+universe grows.
+
+A write touches only the tickers it is given: each gets a new file under
+a fresh generation name, and index.json is swapped in last (temp file +
+os.replace), so readers never see a half-written store and pick up the
+new generation on their next read. Superseded files are retired, not
+deleted, until RETAIN_SECONDS have passed, so a reader that loaded the
+previous index can still open them. The store assumes one writer at a
+time (the market_data build).
+
+    PRICE_STORE_DIR   store location (default: ./price_store)
+    PRICE_STORE=off   ignore the store and always ask the provider
+"""
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'price_store')
+
+# Column -> dtype; frame columns use the yfinance names
+FIELDS = {
+    "date": "datetime64[D]",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+}
+RECORD = np.dtype(list(FIELDS.items()))
+FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+# Bars kept per ticker (about one trading year)
+STORE_BARS = 260
+
+# The server falls back to the provider once a ticker's slice is older than this
+MAX_AGE = 24 * 60 * 60
+
+# Superseded ticker files stay on disk this long for readers of the previous index
+RETAIN_SECONDS = 10 * 60
+
+INDEX_FORMAT = 1
+EMPTY_INDEX = {"format": INDEX_FORMAT, "tickers": {}, "retired": {}, "writtenAt": 0}
+
+
+class PriceStore:
+    """Read side: per-ticker slices over memory-mapped record arrays."""
+
+    def __init__(self, path=DEFAULT_STORE_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index_mtime = None
+        # (index, {file name: mmap}) swapped as one reference so readers never mix generations
+        self._generation = (EMPTY_INDEX, {})
+
+    def _index_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def _reload(self):
+        """Picks up a new index.json, keeping the maps of files it still references."""
+        try:
+            mtime = os.stat(self._index_path()).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._index_mtime:
+            return
+        with self._lock:
+            if mtime == self._index_mtime:
+                return
+            index = _read_index(self._index_path())
+            current = {entry["file"] for entry in index["tickers"].values()}
+            maps = {name: values for name, values in self._generation[1].items() if name in current}
+            self._generation = (index, maps)
+            self._index_mtime = mtime
+
+    def _current(self):
+        self._reload()
+        return self._generation
+
+    def _entry(self, ticker):
+        return self._current()[0]["tickers"].get(ticker.upper())
+
+    def tickers(self):
+        return list(self._current()[0]["tickers"])
+
+    def __contains__(self, ticker):
+        return self._entry(ticker) is not None
+
+    def written_at(self, ticker=None):
+        """When the store (or one ticker's bars) was last written; 0 if never."""
+        if ticker is None:
+            return self._current()[0]["writtenAt"]
+        entry = self._entry(ticker)
+        return entry["writtenAt"] if entry else 0
+
+    def records(self, ticker):
+        """The ticker's read-only memory-mapped record array, or None if it is not stored."""
+        index, maps = self._current()
+        entry = index["tickers"].get(ticker.upper())
+        if entry is None:
+            return None
+        name = entry["file"]
+        values = maps.get(name)
+        if values is None:
+            values = np.load(os.path.join(self.path, name), mmap_mode='r')
+            maps[name] = values
+        return values
+
+    def slice(self, ticker):
+        """{field: read-only array view} for one ticker (no copy), or None if it is not stored."""
+        values = self.records(ticker)
+        if values is None:
+            return None
+        return {field: values[field] for field in FIELDS}
+
+    def history(self, ticker, max_age=None):
+        """
+        Daily bars in the provider's frame layout (a copy of the ticker's
+        bars), or None if missing or written more than max_age seconds ago.
+        """
+        if max_age is not None and time.time() - self.written_at(ticker) > max_age:
+            return None
+        columns = self.slice(ticker)
+        if columns is None:
+            return None
+        index = pd.DatetimeIndex(columns["date"], name="Date")
+        return pd.DataFrame({FRAME_COLUMNS[field]: columns[field] for field in FRAME_COLUMNS}, index=index)
+
+    def rows(self, ticker, last=None):
+        """The ticker's bars as market_data.json priceHistory rows."""
+        columns = self.slice(ticker)
+        if columns is None:
+            return None
+        if last is not None:
+            columns = {field: values[-last:] for field, values in columns.items()}
+        dates = np.datetime_as_string(columns["date"], unit='D')
+        return [
+            {"date": str(date), "close": float(close), "open": float(open_), "high": float(high), "low": float(low)}
+            for date, close, open_, high, low in zip(dates, columns["close"], columns["open"], columns["high"], columns["low"])
+        ]
+
+
+def daily_frame(history):
+    """Provider bars re-indexed by naive calendar date, so frames from any source concatenate."""
+    index = pd.DatetimeIndex(history.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return history.set_axis(index.normalize().rename("Date"), axis=0)
+
+
+def _frame_column(history, field):
+    if field == "date":
+        return daily_frame(history).index.to_numpy().astype('datetime64[D]')
+    column = FRAME_COLUMNS[field]
+    if column not in history:
+        return np.full(len(history), np.nan)
+    return history[column].to_numpy(dtype=FIELDS[field])
+
+
+def _read_index(index_path):
+    with open(index_path) as f:
+        index = json.load(f)
+    if index.get("format") != INDEX_FORMAT:
+        raise ValueError(f"{index_path}: unsupported price store format {index.get('format')!r}")
+    return index
+
+
+def _load_index(path):
+    """The current index to build on (an empty one for a new store)."""
+    try:
+        return _read_index(os.path.join(path, 'index.json'))
+    except FileNotFoundError:
+        return json.loads(json.dumps(EMPTY_INDEX))
+
+
+def _file_name(ticker, generation):
+    safe = "".join(ch if ch.isalnum() or ch in "-._" else "_" for ch in ticker)
+    return f"{safe}.{generation}.npy"
+
+
+def write_store(histories, path=DEFAULT_STORE_DIR, max_bars=STORE_BARS):
+    """
+    Stores {ticker: daily OHLCV frame}, keeping the last max_bars distinct
+    dates of each (a repeated date keeps its latest bar). Other tickers are
+    left as they are. Returns the number of bars written.
+    """
+    os.makedirs(path, exist_ok=True)
+    index = _load_index(path)
+    index.setdefault("retired", {})
+    generation = f"{time.time_ns():x}"
+    now = time.time()
+    written = 0
+
+    for ticker, history in histories.items():
+        history = daily_frame(history)
+        history = history[~history.index.duplicated(keep='last')].sort_index().tail(max_bars)
+        values = np.empty(len(history), dtype=RECORD)
+        for field in FIELDS:
+            values[field] = _frame_column(history, field)
+
+        ticker = ticker.upper()
+        name = _file_name(ticker, generation)
+        np.save(os.path.join(path, name), values)
+        previous = index["tickers"].get(ticker)
+        if previous is not None:
+            index["retired"][previous["file"]] = now
+        index["tickers"][ticker] = {"file": name, "rows": len(values), "writtenAt": now}
+        written += len(values)
+
+    # Retired files are kept for readers of an older index, then removed
+    for name, retired_at in list(index["retired"].items()):
+        if now - retired_at > RETAIN_SECONDS:
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+            del index["retired"][name]
+
+    index["writtenAt"] = now
+    tmp = os.path.join(path, f'index.{generation}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(path, 'index.json'))
+    return written
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """The process-wide store, or None when PRICE_STORE=off."""
+    global _store
+    if os.getenv("PRICE_STORE", "on").lower() == "off":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore(os.getenv("PRICE_STORE_DIR", DEFAULT_STORE_DIR))
+        return _store
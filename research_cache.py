@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ResearchCache:
+    """
+    Per-key TTL cache in front of a slow loader (e.g. yfinance).
+
+    - Fresh entries are returned straight from memory.
+    - Concurrent misses for the same key share a single in-flight load.
+    - Expired entries are served stale while one background refresh runs.
+
+    `on_lookup(outcome)`, if given, is called per get() with "hit", "stale",
+    "miss" or "coalesced" (joined an in-flight load).
+    """
+
+    def __init__(self, loader, ttl=300, stale_ttl=3600, max_entries=1024, refresh_workers=4, on_lookup=None):
+        self._loader = loader
+        self._on_lookup = on_lookup or _ignore
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="research-refresh")
+
+    def get(self, key):
+        """Return the cached value for key, loading it (once) if needed."""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._on_lookup("hit")
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    # Stale-while-revalidate: kick off one refresh, answer immediately
+                    if key not in self._inflight:
+                        future = Future()
+                        self._inflight[key] = future
+                        self._refresher.submit(self._load, key, future)
+                    self._on_lookup("stale")
+                    return value
+
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        self._on_lookup("miss" if is_leader else "coalesced")
+        if is_leader:
+            self._load(key, future)
+        return future.result()
+
+    def refresh(self, key):
+        """Reload key now, even if fresh (joins a load already in flight)."""
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if is_leader:
+            self._load(key, future)
+        return future.result()
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _load(self, key, future):
+        try:
+            value = self._loader(key)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if key in self._entries:
+                # Background refresh failed: keep serving the stale copy
+                print(f"Refresh failed for {key}: {e}")
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+
+class AsyncResearchCache:
+    """
+    asyncio counterpart of ResearchCache, for the async serving mode.
+
+    The loader is a coroutine function. Loads are shielded so a client
+    disconnect never cancels a fetch other requests are waiting on.
+    """
+
+    def __init__(self, loader, ttl=300, stale_ttl=3600, max_entries=1024, on_lookup=None):
+        self._loader = loader
+        self._on_lookup = on_lookup or _ignore
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}  # key -> asyncio.Task
+
+    def peek(self, key):
+        """Return a servable (fresh or stale) value without waiting, else None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            self._on_lookup("hit")
+            return value
+        if age < self.ttl + self.stale_ttl:
+            self._start_load(key)
+            self._on_lookup("stale")
+            return value
+        return None
+
+    async def get(self, key):
+        """Return the cached value for key, loading it (once) if needed."""
+        value = self.peek(key)
+        if value is not None:
+            return value
+        self._on_lookup("coalesced" if key in self._inflight else "miss")
+        return await asyncio.shield(self._start_load(key))
+
+    async def refresh(self, key):
+        """Reload key now, even if fresh (joins a load already in flight)."""
+        return await asyncio.shield(self._start_load(key))
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _start_load(self, key):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key):
+        try:
+            value = await self._loader(key)
+        except Exception as e:
+            if key in self._entries:
+                print(f"Refresh failed for {key}: {e}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+def _ignore(outcome):
+    pass
+
+
+def _consume_exception(task):
+    # Background refreshes may have no awaiter; mark their errors as retrieved
+    if not task.cancelled():
+        task.exception()
@@ -1,228 +1,305 @@
-from flask import Flask, jsonify
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from research_cache import ResearchCache
+from financial_analysis import analyze_financials, summarize_latest, series_payload
+from indicators import compute_indicators, signal_label
+from market_providers import get_provider
+from price_store import MAX_AGE as PRICE_STORE_MAX_AGE, get_price_store
+from stage_timing import timed_stage
+from payload_encoding import dumps, encode_payload
+from prefetch import PREFETCH_ENABLED, PrefetchScheduler
+from metrics import REQUEST_SECONDS, REQUESTS_IN_FLIGHT, UPSTREAM_IN_FLIGHT, record_cache_lookup, render_metrics
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-def generate_insight(metric, current, previous):
-    """Generates a detailed, human-readable insight for a financial metric change."""
-    if previous == 0:
-        return f"{metric} is ${current:,.0f}."
-    
-    change_pct = ((current - previous) / abs(previous)) * 100
-    direction = "increased" if change_pct > 0 else "decreased"
-    magnitude = abs(change_pct)
-    
-    insight = f"{metric} {direction} by {magnitude:.1f}% year-over-year."
-    
-    # Contextual Analysis
-    if metric == "Total Revenue":
-        if magnitude > 15:
-            insight += " This strong growth indicates successful market expansion or high demand."
-        elif magnitude < 2:
-            insight += " This suggests top-line stagnation."
-        elif direction == "decreased":
-            insight += " A decline in revenue is a warning sign of shrinking market share or demand."
-            
-    elif metric == "Net Income":
-        if direction == "increased" and magnitude > 20:
-            insight += " Profitability has improved significantly, showing better cost management or scalability."
-        elif direction == "decreased":
-            insight += " Falling profits despite revenue trends may indicate rising costs or one-time expenses."
-            
-    elif metric == "Operating Income":
-        if direction == "increased":
-            insight += " Core business operations are becoming more efficient."
-        else:
-            insight += " Operational efficiency has declined."
-
-    return insight
+# Research cache settings (seconds)
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "300"))
+RESEARCH_CACHE_STALE_TTL = float(os.getenv("RESEARCH_CACHE_STALE_TTL", "3600"))
 
-@app.route('/api/research/<ticker>', methods=['GET'])
-def get_research(ticker):
-    try:
-        print(f"Fetching data for {ticker}...")
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # 1. Financials Analysis
-        financials = stock.financials
+# Batch endpoint settings
+RESEARCH_BATCH_WORKERS = int(os.getenv("RESEARCH_BATCH_WORKERS", "8"))
+RESEARCH_BATCH_MAX_TICKERS = int(os.getenv("RESEARCH_BATCH_MAX_TICKERS", "100"))
+
+# Global cap on simultaneous upstream (yfinance) fetches
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "16"))
+upstream_slots = threading.BoundedSemaphore(UPSTREAM_CONCURRENCY)
+
+# Research blocks that don't depend on the ticker, shared by every payload
+SWOT_OPPORTUNITIES = [
+    "Expansion into Emerging Markets",
+    "Digital Transformation Initiatives",
+    "Strategic Acquisitions"
+]
+SWOT_THREATS = [
+    "Intense Industry Competition",
+    "Global Economic Uncertainty",
+    "Currency Exchange Fluctuations"
+]
+PESTEL = {
+    "political": "Trade policies and tariffs in major markets could impact costs.",
+    "economic": "Inflationary pressures may affect consumer spending power.",
+    "social": "Changing consumer preferences towards sustainability.",
+    "technological": "Rapid advancements requiring constant R&D investment.",
+    "environmental": "Increasing focus on carbon footprint and ESG compliance.",
+    "legal": "Antitrust scrutiny and data privacy regulations."
+}
+MANAGEMENT = {
+    "score": 85,
+    "details": "Experienced leadership team with a track record of innovation and capital allocation discipline."
+}
+MOAT_DETAILS = [
+    "**Brand Power**: High consumer loyalty and recognition.",
+    "**Scale Advantages**: Cost efficiencies from global operations.",
+    "**Network Effects**: Ecosystem stickiness."
+]
+SECTOR_NEWS = [
+    {"date": "Yesterday", "title": "Analyst upgrades price target citing strong demand.", "impact": "Positive", "sentiment": "Bullish"},
+    {"date": "2 days ago", "title": "Sector-wide volatility affects short-term performance.", "impact": "Neutral", "sentiment": "Neutral"}
+]
+
+def build_research(ticker):
+    """Builds the full research payload for a ticker (uncached, hits yfinance)."""
+    print(f"Fetching data for {ticker}...")
+    provider = get_provider()
+    with timed_stage("info"):
+        info = provider.info(ticker)
+
+    # 1. Financials Analysis
+    with timed_stage("financials"):
+        financials = provider.financials(ticker)
         if financials.empty:
-            financials = stock.quarterly_financials
-            
-        financial_analysis = []
+            financials = provider.quarterly_financials(ticker)
+
+    # Daily bars come from the memory-mapped price store when it has a fresh slice
+    with timed_stage("history"):
+        price_store = get_price_store()
+        history = price_store.history(ticker, max_age=PRICE_STORE_MAX_AGE) if price_store is not None else None
+        if history is None:
+            history = provider.history(ticker, period='1y')
+
+    with timed_stage("analysis"):
+        return _assemble_research(ticker, info, financials, history)
+
+def _assemble_research(ticker, info, financials, history):
+    """Pure payload construction from already-fetched data."""
+    financial_analysis = []
+    financial_series = None
+
+    if not financials.empty:
+        analysis = analyze_financials(financials)
+        financial_analysis = summarize_latest(analysis)
+        financial_series = series_payload(analysis)
+
+    # Fallback if analysis is empty
+    if not financial_analysis:
+         financial_analysis.append({
+             "metric": "Status",
+             "value": "Data Unavailable",
+             "change_reason": "Detailed financial history not available for this ticker."
+         })
+
+    # 2. Technicals from one year of daily bars
+    indicators = compute_indicators(history['Close'].to_numpy() if not history.empty else [])
+    recent = history.tail(20)
+    support = float(recent['Low'].min()) if not recent.empty else None
+    resistance = float(recent['High'].max()) if not recent.empty else None
+
+    # 3. Deep Research Data Construction
+    current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
+    company_name = info.get('longName', ticker) # Ensure we get the real name
+    
+    data = {
+        "price": current_price,
+        "change": info.get('regularMarketChange', 0),
+        "changePercent": info.get('regularMarketChangePercent', 0) * 100,
+        "companyName": company_name,
+        "description": info.get('longBusinessSummary', 'No description available.'),
+        "sector": info.get('sector', 'Unknown'),
+        "industry": info.get('industry', 'Unknown'),
         
-        if not financials.empty:
-            # Get latest 2 periods for comparison
-            cols = financials.columns
-            if len(cols) >= 2:
-                latest = financials.iloc[:, 0]
-                prev = financials.iloc[:, 1]
-                
-                metrics = [
-                    ('Total Revenue', 'Revenue'),
-                    ('Net Income', 'Net Income'),
-                    ('Gross Profit', 'Gross Profit'),
-                    ('Operating Income', 'Operating Income')
-                ]
-                
-                for field, label in metrics:
-                    if field in latest and field in prev:
-                        curr_val = latest[field]
-                        prev_val = prev[field]
-                        
-                        # Calculate Margin if Revenue exists
-                        margin_str = ""
-                        if field == 'Net Income' and 'Total Revenue' in latest:
-                            margin = (curr_val / latest['Total Revenue']) * 100
-                            margin_str = f" (Net Margin: {margin:.1f}%)"
-                        elif field == 'Gross Profit' and 'Total Revenue' in latest:
-                            margin = (curr_val / latest['Total Revenue']) * 100
-                            margin_str = f" (Gross Margin: {margin:.1f}%)"
-
-                        analysis = {
-                            "metric": label,
-                            "value": f"${curr_val:,.0f}",
-                            "change_reason": generate_insight(label, curr_val, prev_val) + margin_str
-                        }
-                        financial_analysis.append(analysis)
+        "ratios": {
+            "marketCap": info.get('marketCap', 0),
+            "trailingPE": info.get('trailingPE', 0),
+            "forwardPE": info.get('forwardPE', 0),
+            "beta": info.get('beta', 0),
+            "dividendYield": info.get('dividendYield', 0)
+        },
+        
+        "financial_analysis": financial_analysis,
+        "financial_series": financial_series,
         
-        # Fallback if analysis is empty
-        if not financial_analysis:
-             financial_analysis.append({
-                 "metric": "Status",
-                 "value": "Data Unavailable",
-                 "change_reason": "Detailed financial history not available for this ticker."
-             })
-
-        # 2. Deep Research Data Construction
-        current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
-        company_name = info.get('longName', ticker) # Ensure we get the real name
+        "technicals": {
+            "currentPrice": current_price,
+            "targetHigh": info.get('targetHighPrice', 0),
+            "targetLow": info.get('targetLowPrice', 0),
+            "targetMean": info.get('targetMeanPrice', 0),
+            "recommendation": info.get('recommendationKey', 'none').replace('_', ' ').title(),
+            **indicators
+        },
         
-        data = {
-            "price": current_price,
-            "change": info.get('regularMarketChange', 0),
-            "changePercent": info.get('regularMarketChangePercent', 0) * 100,
-            "companyName": company_name,
-            "description": info.get('longBusinessSummary', 'No description available.'),
-            "sector": info.get('sector', 'Unknown'),
-            "industry": info.get('industry', 'Unknown'),
-            
+        "deep_research": {
             "ratios": {
-                "marketCap": info.get('marketCap', 0),
-                "trailingPE": info.get('trailingPE', 0),
-                "forwardPE": info.get('forwardPE', 0),
-                "beta": info.get('beta', 0),
-                "dividendYield": info.get('dividendYield', 0)
-            },
-            
-            "financial_analysis": financial_analysis,
-            
-            "technicals": {
-                "currentPrice": current_price,
-                "targetHigh": info.get('targetHighPrice', 0),
-                "targetLow": info.get('targetLowPrice', 0),
-                "targetMean": info.get('targetMeanPrice', 0),
-                "recommendation": info.get('recommendationKey', 'none').replace('_', ' ').title()
+                "liquidity": [
+                    {"name": "Current Ratio", "value": f"{info.get('currentRatio', 0):.2f}", "status": "Good" if info.get('currentRatio', 0) > 1.5 else "Neutral", "insight": "Ability to pay short-term obligations."},
+                    {"name": "Quick Ratio", "value": f"{info.get('quickRatio', 0):.2f}", "status": "Good" if info.get('quickRatio', 0) > 1.0 else "Neutral", "insight": "Liquidity excluding inventory."}
+                ],
+                "profitability": [
+                    {"name": "Profit Margin", "value": f"{info.get('profitMargins', 0)*100:.1f}%", "status": "Good" if info.get('profitMargins', 0) > 0.15 else "Neutral", "insight": "Net income as % of revenue."},
+                    {"name": "ROA", "value": f"{info.get('returnOnAssets', 0)*100:.1f}%", "status": "Neutral", "insight": "Efficiency of asset use."}
+                ],
+                "solvency": [
+                    {"name": "Debt-to-Equity", "value": f"{info.get('debtToEquity', 0)/100:.2f}", "status": "Caution" if info.get('debtToEquity', 0) > 200 else "Good", "insight": "Financial leverage."}
+                ]
             },
-            
-            "deep_research": {
-                "ratios": {
-                    "liquidity": [
-                        {"name": "Current Ratio", "value": f"{info.get('currentRatio', 0):.2f}", "status": "Good" if info.get('currentRatio', 0) > 1.5 else "Neutral", "insight": "Ability to pay short-term obligations."},
-                        {"name": "Quick Ratio", "value": f"{info.get('quickRatio', 0):.2f}", "status": "Good" if info.get('quickRatio', 0) > 1.0 else "Neutral", "insight": "Liquidity excluding inventory."}
+            "qualitative": {
+                "swot": {
+                    "strengths": [
+                        "Strong Brand Recognition" if info.get('marketCap', 0) > 1e11 else "Growing Market Presence",
+                        "High Profit Margins" if info.get('profitMargins', 0) > 0.2 else "Improving Operational Efficiency",
+                        "Global Distribution Network"
                     ],
-                    "profitability": [
-                        {"name": "Profit Margin", "value": f"{info.get('profitMargins', 0)*100:.1f}%", "status": "Good" if info.get('profitMargins', 0) > 0.15 else "Neutral", "insight": "Net income as % of revenue."},
-                        {"name": "ROA", "value": f"{info.get('returnOnAssets', 0)*100:.1f}%", "status": "Neutral", "insight": "Efficiency of asset use."}
+                    "weaknesses": [
+                        "High Valuation Multiples" if info.get('trailingPE', 0) > 30 else "Competitive Market Pressure",
+                        "Regulatory Risks in Key Markets",
+                        "Supply Chain Dependencies"
                     ],
-                    "solvency": [
-                        {"name": "Debt-to-Equity", "value": f"{info.get('debtToEquity', 0)/100:.2f}", "status": "Caution" if info.get('debtToEquity', 0) > 200 else "Good", "insight": "Financial leverage."}
-                    ]
-                },
-                "qualitative": {
-                    "swot": {
-                        "strengths": [
-                            "Strong Brand Recognition" if info.get('marketCap', 0) > 1e11 else "Growing Market Presence",
-                            "High Profit Margins" if info.get('profitMargins', 0) > 0.2 else "Improving Operational Efficiency",
-                            "Global Distribution Network"
-                        ],
-                        "weaknesses": [
-                            "High Valuation Multiples" if info.get('trailingPE', 0) > 30 else "Competitive Market Pressure",
-                            "Regulatory Risks in Key Markets",
-                            "Supply Chain Dependencies"
-                        ],
-                        "opportunities": [
-                            "Expansion into Emerging Markets",
-                            "Digital Transformation Initiatives",
-                            "Strategic Acquisitions"
-                        ],
-                        "threats": [
-                            "Intense Industry Competition",
-                            "Global Economic Uncertainty",
-                            "Currency Exchange Fluctuations"
-                        ]
-                    },
-                    "pestel": {
-                        "political": "Trade policies and tariffs in major markets could impact costs.",
-                        "economic": "Inflationary pressures may affect consumer spending power.",
-                        "social": "Changing consumer preferences towards sustainability.",
-                        "technological": "Rapid advancements requiring constant R&D investment.",
-                        "environmental": "Increasing focus on carbon footprint and ESG compliance.",
-                        "legal": "Antitrust scrutiny and data privacy regulations."
-                    },
-                    "management": {
-                        "score": 85,
-                        "details": "Experienced leadership team with a track record of innovation and capital allocation discipline."
-                    },
-                    "moat": {
-                        "score": 90 if info.get('marketCap', 0) > 1e11 else 75,
-                        "details": [
-                            "**Brand Power**: High consumer loyalty and recognition.",
-                            "**Scale Advantages**: Cost efficiencies from global operations.",
-                            "**Network Effects**: Ecosystem stickiness."
-                        ]
-                    }
+                    "opportunities": SWOT_OPPORTUNITIES,
+                    "threats": SWOT_THREATS
                 },
-                "technicals": {
-                    "rsi": 55.4,
-                    "macd": 1.25,
-                    "sma50": current_price * 0.95,
-                    "sma200": current_price * 0.90,
-                    "support": current_price * 0.92,
-                    "resistance": current_price * 1.08,
-                    "signal": "Neutral"
-                },
-                "valuation": {
-                    "dcf": {
-                        "fairValue": current_price * (1.1 if info.get('recommendationKey') == 'buy' else 0.9),
-                        "upside": 10.5,
-                        "assumptions": ["WACC: 8.5%", "Terminal Growth: 3.0%"]
-                    },
-                    "multiples": {
-                        "pe": f"{info.get('trailingPE', 0):.1f}x",
-                        "ps": f"{info.get('priceToSalesTrailing12Months', 0):.1f}x",
-                        "pb": f"{info.get('priceToBook', 0):.1f}x"
-                    }
+                "pestel": PESTEL,
+                "management": MANAGEMENT,
+                "moat": {
+                    "score": 90 if info.get('marketCap', 0) > 1e11 else 75,
+                    "details": MOAT_DETAILS
+                }
+            },
+            "technicals": {
+                "rsi": indicators["rsi"],
+                "macd": indicators["macd"],
+                "sma50": indicators["sma50"],
+                "sma200": indicators["sma200"],
+                "support": support,
+                "resistance": resistance,
+                "signal": signal_label(indicators)
+            },
+            "valuation": {
+                "dcf": {
+                    "fairValue": current_price * (1.1 if info.get('recommendationKey') == 'buy' else 0.9),
+                    "upside": 10.5,
+                    "assumptions": ["WACC: 8.5%", "Terminal Growth: 3.0%"]
                 },
-                "news": [
-                    {"date": "Today", "title": f"{ticker} announces strategic partnership to expand AI capabilities.", "impact": "Positive", "sentiment": "Bullish"},
-                    {"date": "Yesterday", "title": "Analyst upgrades price target citing strong demand.", "impact": "Positive", "sentiment": "Bullish"},
-                    {"date": "2 days ago", "title": "Sector-wide volatility affects short-term performance.", "impact": "Neutral", "sentiment": "Neutral"}
-                ]
-            }
+                "multiples": {
+                    "pe": f"{info.get('trailingPE', 0):.1f}x",
+                    "ps": f"{info.get('priceToSalesTrailing12Months', 0):.1f}x",
+                    "pb": f"{info.get('priceToBook', 0):.1f}x"
+                }
+            },
+            "news": [
+                {"date": "Today", "title": f"{ticker} announces strategic partnership to expand AI capabilities.", "impact": "Positive", "sentiment": "Bullish"},
+                *SECTOR_NEWS
+            ]
         }
-        
-        return jsonify(data)
+    }
+    
+    return data
+
+def serialize_research(data):
+    """Encodes a payload once: JSON bytes, gzip/brotli variants and ETag."""
+    with timed_stage("serialization"):
+        return encode_payload(data)
+
+def fetch_research(ticker):
+    """Cache loader: build_research under the global upstream limit, then serialize."""
+    with upstream_slots, UPSTREAM_IN_FLIGHT.track_inprogress():
+        data = build_research(ticker)
+    return serialize_research(data)
+
+research_cache = ResearchCache(fetch_research, ttl=RESEARCH_CACHE_TTL, stale_ttl=RESEARCH_CACHE_STALE_TTL,
+                               on_lookup=record_cache_lookup)
+prefetcher = PrefetchScheduler(research_cache.refresh)
+batch_pool = ThreadPoolExecutor(max_workers=RESEARCH_BATCH_WORKERS, thread_name_prefix="research-batch")
+
+def parse_tickers(raw):
+    """Splits a comma-separated ticker list, upper-cased and de-duplicated in order."""
+    tickers = []
+    for part in (raw or '').split(','):
+        ticker = part.strip().upper()
+        if ticker and ticker not in tickers:
+            tickers.append(ticker)
+    return tickers
+
+def stream_research(tickers):
+    """Yields one NDJSON line per ticker, in completion order."""
+    with REQUESTS_IN_FLIGHT.labels('batch').track_inprogress(), REQUEST_SECONDS.labels('batch').time():
+        futures = {batch_pool.submit(research_cache.get, ticker): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                line = ndjson_line(ticker, future.result())
+                prefetcher.record_request(ticker)
+                yield line
+            except Exception as e:
+                print(f"Error for {ticker}: {e}")
+                yield ndjson_error(ticker, str(e))
+
+def ndjson_line(ticker, payload):
+    """One NDJSON line embedding the cached JSON body as-is (no re-serialization)."""
+    return b'{"ticker":' + dumps(ticker) + b',"data":' + payload.body + b'}\n'
+
+def ndjson_error(ticker, message):
+    return dumps({"ticker": ticker, "error": message}) + b"\n"
+
+def payload_headers(payload, encoding=None):
+    return {"ETag": payload.etag_for(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+@app.route('/api/research', methods=['GET'])
+def get_research_batch():
+    tickers = parse_tickers(request.args.get('tickers'))
+    if not tickers:
+        return jsonify({"error": "Pass tickers as ?tickers=TSLA,NVDA,..."}), 400
+    if len(tickers) > RESEARCH_BATCH_MAX_TICKERS:
+        return jsonify({"error": f"At most {RESEARCH_BATCH_MAX_TICKERS} tickers per request."}), 400
+
+    return Response(stream_with_context(stream_research(tickers)), mimetype='application/x-ndjson')
+
+@app.route('/api/research/<ticker>', methods=['GET'])
+def get_research(ticker):
+    with REQUESTS_IN_FLIGHT.labels('research').track_inprogress(), REQUEST_SECONDS.labels('research').time():
+        return _research_response(ticker)
+
+def _research_response(ticker):
+    ticker = ticker.upper()
+    try:
+        payload = research_cache.get(ticker)
+        prefetcher.record_request(ticker)
+        body, encoding = payload.negotiate(request.headers.get('Accept-Encoding'))
+        headers = payload_headers(payload, encoding)
+        if payload.matches(request.headers.get('If-None-Match')):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(body, mimetype='application/json', headers=headers)
 
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
 if __name__ == '__main__':
     print("Starting AlphaOne Research Server on port 5000...")
+    # Only the reloader's serving child prefetches, not the file-watching parent
+    if PREFETCH_ENABLED and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        prefetcher.start()
     app.run(debug=True, port=5000)
@@ -59,6 +59,41 @@ const REAL_PRICES = {
     "NFLX": 890.00 // Estimated based on recent trends
 };
 
+// Sharded Data: data.js may carry only a manifest (generate_data_js.py --sharded)
+const shardRequests = {};
+
+function decodeColumns(columns) {
+    const fields = Object.keys(columns);
+    if (fields.length === 0) return [];
+    return columns[fields[0]].map((_, i) => {
+        const row = {};
+        fields.forEach(field => { row[field] = columns[field][i]; });
+        return row;
+    });
+}
+
+function ensureMarketData(ticker) {
+    if (marketData[ticker] || typeof MARKET_DATA_MANIFEST === 'undefined' || !MARKET_DATA_MANIFEST[ticker]) {
+        return Promise.resolve();
+    }
+    if (!shardRequests[ticker]) {
+        shardRequests[ticker] = fetch(`data/${MARKET_DATA_MANIFEST[ticker]}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`Shard request failed (${response.status})`);
+                return response.json();
+            })
+            .then(entry => {
+                entry.priceHistory = decodeColumns(entry.priceHistory || {});
+                marketData[ticker] = entry;
+            })
+            .catch(error => {
+                console.warn(`Could not load data shard for ${ticker}`, error);
+                delete shardRequests[ticker];
+            });
+    }
+    return shardRequests[ticker];
+}
+
 // Data Factory: Generate Mock Data for New Tickers
 function generateMockData(ticker) {
     const seed = ticker.charCodeAt(0) + ticker.charCodeAt(1) || 0; // Simple seed
@@ -210,7 +245,9 @@ async function handleSearch(event) {
                 throw new Error("Server returned error");
             }
         } catch (error) {
-            console.warn("Local server unavailable or failed, falling back to mock data.", error);
+            console.warn("Local server unavailable or failed, falling back to bundled or mock data.", error);
+            // A ticker with a data shard gets its real numbers before any mock
+            await ensureMarketData(ticker);
             if (!marketData[ticker]) {
                 marketData[ticker] = generateMockData(ticker);
             }
@@ -283,7 +320,7 @@ window.onclick = function (event) {
 
 // Initialize Dashboard
 document.addEventListener('DOMContentLoaded', () => {
-    loadCompany(currentTicker);
+    ensureMarketData(currentTicker).then(() => loadCompany(currentTicker));
 
     // Enhanced Live Updates Simulation
     setInterval(() => {
@@ -327,7 +364,7 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 // Switch Company
-function switchCompany(ticker) {
+async function switchCompany(ticker) {
     currentTicker = ticker;
 
     // Update Sidebar Active State
@@ -338,7 +375,8 @@ function switchCompany(ticker) {
         }
     });
 
-    loadCompany(ticker);
+    await ensureMarketData(ticker);
+    if (currentTicker === ticker) loadCompany(ticker);
 }
 
 // Switch Tab
@@ -491,24 +529,30 @@ function updateRatios(ratios) {
     `;
 }
 
+// Indicators are null when the history is too short for their window
+function formatIndicator(value, digits, prefix = '') {
+    return value == null ? '—' : `${prefix}${value.toFixed(digits)}`;
+}
+
 function updateTechnicalsGrid(tech) {
     const grid = document.getElementById('technicals-grid');
+    const rsiColor = tech.rsi == null ? 'white' : tech.rsi > 70 ? 'var(--danger-color)' : tech.rsi < 30 ? 'var(--success-color)' : 'white';
     grid.innerHTML = `
         <div class="stat-item">
             <span class="stat-label">RSI (14)</span>
-            <span class="stat-value" style="color: ${tech.rsi > 70 ? 'var(--danger-color)' : tech.rsi < 30 ? 'var(--success-color)' : 'white'}">${tech.rsi.toFixed(1)}</span>
+            <span class="stat-value" style="color: ${rsiColor}">${formatIndicator(tech.rsi, 1)}</span>
         </div>
         <div class="stat-item">
             <span class="stat-label">MACD</span>
-            <span class="stat-value">${tech.macd.toFixed(2)}</span>
+            <span class="stat-value">${formatIndicator(tech.macd, 2)}</span>
         </div>
         <div class="stat-item">
             <span class="stat-label">SMA 50</span>
-            <span class="stat-value">$${tech.sma50.toFixed(2)}</span>
+            <span class="stat-value">${formatIndicator(tech.sma50, 2, '$')}</span>
         </div>
         <div class="stat-item">
             <span class="stat-label">SMA 200</span>
-            <span class="stat-value">$${tech.sma200.toFixed(2)}</span>
+            <span class="stat-value">${formatIndicator(tech.sma200, 2, '$')}</span>
         </div>
     `;
 }
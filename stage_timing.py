@@ -0,0 +1,34 @@
+"""
+Named stage timing for the research pipeline.
+
+Code wraps each stage in `with timed_stage("info"):`; anything that wants
+the durations (benchmarks, metrics) registers an observer. Observers also
+see whether the stage raised.
+"""
+import time
+from contextlib import contextmanager
+
+_observers = []
+
+
+def add_stage_observer(callback):
+    """Registers callback(stage, seconds, failed), called after every timed stage."""
+    _observers.append(callback)
+
+
+def remove_stage_observer(callback):
+    if callback in _observers:
+        _observers.remove(callback)
+
+
+@contextmanager
+def timed_stage(stage):
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        elapsed = time.perf_counter() - start
+        for callback in list(_observers):
+            callback(stage, elapsed, failed)